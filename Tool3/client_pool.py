@@ -0,0 +1,103 @@
+import threading
+
+
+class ClientPool:
+    """
+    Creates each provider's LLM client once and hands the same instance to every caller.
+
+    factories maps a provider name to a zero-argument function that builds its
+    client (or returns None when it cannot, e.g. a missing API key; nothing is
+    cached then, so the next call tries again). The SDK clients and the
+    requests.Session used for OpenRouter are thread-safe and keep their HTTP
+    connections alive, so sharing them across the generation threads avoids a
+    new TCP/TLS handshake per object.
+    """
+
+    def __init__(self, factories: dict):
+        self._factories = factories
+        self._clients = {}
+        self._created = {}
+        self._acquired = {}
+        self._lock = threading.Lock()
+
+    def get(self, llm_provider: str):
+        """
+        Returns the shared client for a provider, creating it on first use.
+
+        The factory (SDK import and client setup) runs outside the lock, so
+        threads asking for other providers are not held up. If two threads
+        build the same client at once, the first one stored wins and the other
+        is closed.
+        """
+        with self._lock:
+            self._acquired[llm_provider] = self._acquired.get(llm_provider, 0) + 1
+            client = self._clients.get(llm_provider)
+        if client is not None:
+            return client
+
+        built = self._factories[llm_provider]()
+        if built is None:
+            return None
+        with self._lock:
+            client = self._clients.setdefault(llm_provider, built)
+            if client is built:
+                self._created[llm_provider] = self._created.get(llm_provider, 0) + 1
+        if client is not built:
+            close = getattr(built, "close", None)
+            if callable(close):
+                close()
+        return client
+
+    def __len__(self):
+        return len(self._clients)
+
+    def stats(self) -> dict:
+        """
+        Per-provider counters: clients created, times a client was handed out and,
+        for requests sessions, HTTP connections opened and requests sent over them.
+        """
+        with self._lock:
+            result = {}
+            for provider, acquired in self._acquired.items():
+                entry = {"clients_created": self._created.get(provider, 0), "acquired": acquired}
+                entry.update(_connection_stats(self._clients.get(provider)))
+                result[provider] = entry
+            return result
+
+    def report(self) -> str:
+        """Formats stats() as a one-line summary."""
+        parts = []
+        for provider, s in sorted(self.stats().items()):
+            line = f"{provider}: {s['clients_created']} client(s) for {s['acquired']} call(s)"
+            if "connections_opened" in s:
+                line += f", {s['connections_opened']} connection(s) for {s['http_requests']} HTTP request(s)"
+            parts.append(line)
+        return f"🔌 Client pool ({len(self)} active): " + ("; ".join(parts) if parts else "unused")
+
+    def close(self):
+        """Closes every client that supports it and empties the pool."""
+        with self._lock:
+            for client in self._clients.values():
+                close = getattr(client, "close", None)
+                if callable(close):
+                    close()
+            self._clients.clear()
+
+
+def _connection_stats(client) -> dict:
+    """Connection counters of a requests.Session, read from its urllib3 connection pools."""
+    adapters = getattr(client, "adapters", None)
+    if not isinstance(adapters, dict):
+        return {}
+    opened = sent = 0
+    # The same adapter is usually mounted for both http:// and https://
+    for adapter in {id(a): a for a in adapters.values()}.values():
+        pool_manager = getattr(adapter, "poolmanager", None)
+        if pool_manager is None:
+            continue
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+    return {"connections_opened": opened, "http_requests": sent}
@@ -1,175 +1,15 @@
+import hashlib
 import json
 import os
 from collections import Counter
 import re
-from llm_service import generate_business_logic
+from llm_service import generate_business_logic, CLIENT_POOL
+from generation_engine import GenerationEngine
+from llm_cache import LLMCache, DEFAULT_CACHE_DIR
+from sql_scanner import group_sql_objects, iter_sql_objects, scan_sql_file
+from markdown_writer import MarkdownWriter, ShardedMarkdownWriter
 
-
-def slugify(text):
-    # Converts text to a GitHub-compatible anchor
-    text = text.lower()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = text.replace(" ", "-")
-    return text
-
-# Load the SQL file
-with open("input/test/test1.sql", "r") as f:
-    sql_text = f.read()
-
-# Simple regex to extract stored procedure blocks (you can improve this as needed)
-procedure_blocks = re.findall(r"CREATE\s+PROCEDURE\s+.*?AS\s+BEGIN(.*?)END", sql_text, re.DOTALL | re.IGNORECASE)
-
-def generate_markdown(proc_name, details, llm_provider):
-    anchor = slugify(proc_name)
-    md = []
-    md.append(f"## Stored Procedure: {proc_name}\n<a name=\"{anchor}\"></a>\n\n---\n")
-
-    # Parameters
-    md.append("### Parameters\n")
-    md.append("| Name | Type |\n|------|------|")
-    for param in details.get("params", []):
-        md.append(f"| {param['name']} | {param['type']} |")
-    md.append("\n---\n")
-
-    # Tables
-    md.append("### Tables\n")
-    for table in details.get("tables", []):
-        md.append(f"- {table}")
-    md.append("\n---\n")
-
-    # Called Procedures
-    md.append("### Called Procedures\n")
-    for proc in details.get("calls", []):
-        md.append(f"- {proc}")
-    md.append("\n---\n")
-
-    # Call Graph - Mermaid
-    md.append("### Call Graph\n")
-    md.append("```mermaid\ngraph TD")
-    for proc in details.get("calls", []):
-        md.append(f"    {proc_name} --> {proc}")
-    for table in details.get("tables", []):
-        md.append(f"    {proc_name} --> {table}")
-    md.append("```\n\n---\n")
-
-    # Business Logic via LLM
-    md.append("### Business Logic\n")
-    try:
-        sql_code = details.get("sql", "")
-        params_list = [f"@{p['name']}" for p in details.get("params", [])]
-        
-        # PASS llm_provider to the final function call
-        description = generate_business_logic(
-            proc_name, 
-            params_list, 
-            details.get("tables", []), 
-            sql_code, 
-            llm_provider  # The missing argument
-        )
-        md.append(description)
-    except Exception as e:
-        md.append("Description could not be generated due to an error.\n")
-        print(f"⚠️ Error generating description for {proc_name}: {e}")
-
-    md.append("\n---\n\n")
-    return "\n".join(md)
-
-def generate_summary(data):
-    total_procedures = len(data)
-    
-    # Collect unique tables
-    all_tables = set()
-    for details in data.values():
-        all_tables.update(details.get("tables", []))
-    total_tables = len(all_tables)
-
-    # Count how many times each proc is called
-    call_counter = Counter()
-    for details in data.values():
-        call_counter.update(details.get("calls", []))
-
-    most_called_proc = call_counter.most_common(1)[0][0] if call_counter else "N/A"
-
-    summary = [
-        "# Summary\n",
-        f"- **Total Procedures**: {total_procedures}",
-        f"- **Total Tables**: {total_tables}",
-        f"- **Most Called Procedure**: `{most_called_proc}`",
-        "\n---\n"
-    ]
-    return "\n".join(summary)
-
-def generate_toc(data):
-    toc_lines = ["# Table of Contents\n"]
-    for proc_name in data:
-        anchor = slugify(proc_name)
-        toc_lines.append(f"- [{proc_name}](#{anchor})")
-    toc_lines.append("\n---\n")
-    return "\n".join(toc_lines)
-
-def extract_sql_blocks(sql_text):
-    proc_blocks = {}
-    pattern = re.compile(r"CREATE\s+PROCEDURE\s+(\w+).*?AS\s+BEGIN(.*?)END", re.DOTALL | re.IGNORECASE)
-    for match in pattern.finditer(sql_text):
-        proc_name = match.group(1)
-        sql_body = match.group(0)  # Full block including CREATE ... END
-        proc_blocks[proc_name] = sql_body.strip()
-    return proc_blocks
-
-
-def prompt_for_llm_provider():
-    """Interactively prompts the user to select an LLM provider."""
-    providers = {"1": "gemini", "2": "azure", "3": "anthropic", "4": "openrouter"}
-    print("\nPlease select an LLM provider to generate descriptions:")
-    for key, value in providers.items():
-        print(f"  {key}: {value.capitalize()}")
-    
-    while True:
-        choice = input("Enter the number for your choice (1/2/3/4): ")
-        if choice in providers:
-            return providers[choice]
-        else:
-            print("❌ Invalid selection. Please enter 1, 2, or 3.")
-
-
-def generate_docs(json_path,  llm_provider, output_dir="docs", output_file="procedures.md"):
-    with open(json_path) as f:
-        data = json.load(f)
-
-    sql_blocks = extract_sql_blocks(sql_text)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    all_markdown = []
-
-     # Announce which LLM is being used based on user's choice
-    print(f"✅ Using [{llm_provider.upper()}] to generate business logic descriptions.")
-
-    # Add summary
-    all_markdown.append(generate_summary(data))
-
-    # Add TOC
-    all_markdown.append(generate_toc(data))
-
-    # Add procedure markdown blocks
-    for proc_name, details in data.items():
-        # Attach SQL block before passing to markdown generator
-        details["sql"] = sql_blocks.get(proc_name, "")
-        markdown = generate_markdown(proc_name, details, llm_provider)
-        all_markdown.append(markdown)
-
-    full_doc = "\n".join(all_markdown)
-    output_path = os.path.join(output_dir, output_file)
-    with open(output_path, "w") as f:
-        f.write(full_doc)
-
-    print(f"Generated: {output_path}")
-    
-import json
-import os
-from collections import Counter
-import re
-from llm_service import generate_business_logic
+DEFAULT_SQL_PATH = os.path.join("input", "test", "test1.sql")
 
 
 def slugify(text):
@@ -179,15 +19,18 @@ def slugify(text):
     text = text.replace(" ", "-")
     return text
 
-# Load the SQL file
-with open("input/test/test1.sql", "r") as f:
-    sql_text = f.read()
+def generate_markdown(obj_name, details, llm_provider, obj_type="procedure", cache=None):
+    """Generates markdown documentation for procedures, functions, or triggers."""
+    return generate_section(obj_name, details, llm_provider, obj_type, cache)[0]
 
-# Simple regex to extract stored procedure blocks (you can improve this as needed)
-procedure_blocks = re.findall(r"CREATE\s+PROCEDURE\s+.*?AS\s+BEGIN(.*?)END", sql_text, re.DOTALL | re.IGNORECASE)
+def generate_section(obj_name, details, llm_provider, obj_type="procedure", cache=None):
+    """
+    Like generate_markdown, but returns (markdown, ok).
 
-def generate_markdown(obj_name, details, llm_provider, obj_type="procedure"):
-    """Generates markdown documentation for procedures, functions, or triggers."""
+    ok is False when the business logic could not be generated and the
+    section only holds a placeholder, so it should be generated again later.
+    """
+    ok = True
     anchor = slugify(obj_name)
     md = []
     md.append(f"## {obj_type.capitalize()}: {obj_name}\n<a name=\"{anchor}\"></a>\n\n---\n")
@@ -232,15 +75,17 @@ def generate_markdown(obj_name, details, llm_provider, obj_type="procedure"):
             params_list,
             details.get("tables", []),
             sql_code,
-            llm_provider
+            llm_provider,
+            cache=cache
         )
         md.append(description)
     except Exception as e:
         md.append("Description could not be generated due to an error.\n")
         print(f"⚠️ Error generating description for {obj_name}: {e}")
+        ok = False
 
     md.append("\n---\n\n")
-    return "\n".join(md)
+    return "\n".join(md), ok
 
 def generate_summary(data):
     total_procedures = len(data.get("procedures", {}))
@@ -285,23 +130,13 @@ def generate_toc(data):
     return "\n".join(toc_lines)
 
 def extract_sql_blocks(sql_text):
-    proc_blocks = {}
-
-    patterns = {
-        "procedures": re.compile(r"CREATE\s+PROCEDURE\s+(\w+).*?AS\s+BEGIN(.*?)END", re.DOTALL | re.IGNORECASE),
-        "functions": re.compile(r"CREATE\s+FUNCTION\s+(\w+).*?AS\s+BEGIN(.*?)END", re.DOTALL | re.IGNORECASE),
-        "triggers": re.compile(r"CREATE\s+TRIGGER\s+(\w+).*?AS\s+BEGIN(.*?)END", re.DOTALL | re.IGNORECASE),
-    }
+    """Splits a SQL script into {"procedures": {...}, "functions": {...}, "triggers": {...}} by object name."""
+    return group_sql_objects(iter_sql_objects(sql_text.splitlines(keepends=True)))
 
-    results = {"procedures": {}, "functions": {}, "triggers": {}}
 
-    for key, pattern in patterns.items():
-        for match in pattern.finditer(sql_text):
-            name = match.group(1)
-            sql_body = match.group(0)
-            results[key][name] = sql_body.strip()
-
-    return results
+def load_sql_blocks(sql_path):
+    """extract_sql_blocks for a script on disk, scanned in a single pass."""
+    return group_sql_objects(scan_sql_file(sql_path))
 
 def prompt_for_llm_provider():
     """Interactively prompts the user to select an LLM provider."""
@@ -317,41 +152,96 @@ def prompt_for_llm_provider():
         else:
             print("❌ Invalid selection. Please enter 1, 2, 3, 4, or 5.")
 
-def generate_docs(json_path,  llm_provider, output_dir="docs", output_file="procedures.md"):
+def document_fingerprint(data, llm_provider):
+    """Hash of everything a document's content depends on; a resumed run must match it."""
+    payload = json.dumps({"provider": llm_provider, "index": data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def generate_docs(json_path,  llm_provider, output_dir="docs", output_file="procedures.md", max_workers=None,
+                  use_cache=True, cache_dir=DEFAULT_CACHE_DIR, sql_path=None, cache=None, resume=True,
+                  sharded=False):
+    """
+    Writes the Markdown documentation for every object in the index at json_path.
+
+    sql_path selects the SQL script the object bodies are taken from (defaults
+    to input/test/test1.sql); it is scanned when this is called. An already open
+    LLMCache can be passed as cache to share it between several calls; it is
+    then left open for the caller.
+
+    The summary and table of contents come first, then each object's section
+    is appended as soon as it and all sections before it are generated (see
+    MarkdownWriter). An interrupted run for the same index, SQL and provider
+    continues after its last written section unless resume is False.
+    Sections whose description failed (e.g. a rate limit) are written with a
+    placeholder but not journaled, so a resumed run generates them again;
+    their keys are returned.
+
+    With sharded=True the summary and every object go to their own files in
+    a directory named after output_file (procedures1.md -> procedures1/),
+    with an index.json manifest of titles, anchors and sizes instead of a TOC
+    (see ShardedMarkdownWriter).
+    """
     with open(json_path) as f:
         data = json.load(f)
 
-    sql_blocks = extract_sql_blocks(sql_text)
+    sql_blocks = load_sql_blocks(sql_path or DEFAULT_SQL_PATH)
 
     os.makedirs(output_dir, exist_ok=True)
 
-    all_markdown = []
-
      # Announce which LLM is being used based on user's choice
     print(f"✅ Using [{llm_provider.upper()}] to generate business logic descriptions.")
 
-    # Add summary
-    all_markdown.append(generate_summary(data))
-
-    # Add TOC
-    all_markdown.append(generate_toc(data))
-
-    # Add procedure markdown blocks
-    # for proc_name, details in data.items():
-    #     # Attach SQL block before passing to markdown generator
-    #     details["sql"] = sql_blocks.get(proc_name, "")
-    #     markdown = generate_markdown(proc_name, details, llm_provider)
-    #     all_markdown.append(markdown)
+    # Descriptions are cached by prompt, so unchanged objects cost no LLM call
+    owns_cache = cache is None and use_cache
+    if owns_cache:
+        cache = LLMCache(cache_dir)
+    elif not use_cache:
+        cache = None
 
+    jobs = []
     for section, obj_type in [("procedures", "procedure"), ("functions", "function"), ("triggers", "trigger")]:
         for obj_name, details in data.get(section, {}).items():
             details["sql"] = sql_blocks.get(section, {}).get(obj_name, "")
-            markdown = generate_markdown(obj_name, details, llm_provider, obj_type=obj_type)
-            all_markdown.append(markdown)
-
-    full_doc = "\n".join(all_markdown)
-    output_path = os.path.join(output_dir, output_file)
-    with open(output_path, "w") as f:
-        f.write(full_doc)
+            job = ((obj_name, details, llm_provider), {"obj_type": obj_type, "cache": cache})
+            meta = {"type": obj_type, "name": obj_name, "title": f"{obj_type.capitalize()}: {obj_name}",
+                    "anchor": slugify(obj_name)}
+            jobs.append((f"{obj_type}:{obj_name}", meta, job))
+
+    fingerprint = document_fingerprint(data, llm_provider)
+    if sharded:
+        output_path = os.path.join(output_dir, os.path.splitext(output_file)[0])
+        writer = ShardedMarkdownWriter(output_path, fingerprint, resume=resume)
+    else:
+        output_path = os.path.join(output_dir, output_file)
+        writer = MarkdownWriter(output_path, fingerprint, resume=resume)
+    done = set(writer.completed)
+    pending = [(key, meta, job) for key, meta, job in jobs if key not in done]
+
+    # The LLM calls dominate the run time, so sections are generated concurrently
+    # and written back in index order.
+    engine = GenerationEngine(llm_provider, max_workers=max_workers)
+    try:
+        # The summary and TOC only need the index, so they are written first
+        if "summary" not in done:
+            header = generate_summary(data) if sharded else generate_summary(data) + "\n" + generate_toc(data)
+            writer.write(header, "summary", type="summary", title="Summary", anchor="summary")
+        results = engine.map(generate_section, [job for _, _, job in pending])
+        failed = []
+        for (key, meta, _), (markdown, ok) in zip(pending, results):
+            # Failed sections are not journaled, so a resumed run generates them again
+            writer.write(markdown, key, failed=not ok, **meta)
+            if not ok:
+                failed.append(key)
+        writer.commit()
+    finally:
+        writer.close()
+        if owns_cache:
+            print(cache.report())
+            cache.close()
+    print(engine.report())
+    print(CLIENT_POOL.report())
 
-    print(f"Generated: {output_path}")
\ No newline at end of file
+    print(f"Generated: {output_path}")
+    if failed:
+        print(f"⚠️ {len(failed)} section(s) have no description and will be generated again on the next run")
+    return failed
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Default number of in-flight LLM requests per provider. These are conservative
+# values that stay below the usual free/standard tier rate limits and can be
+# overridden per provider with e.g. LLM_CONCURRENCY_GEMINI=8 in the .env file.
+PROVIDER_CONCURRENCY = {
+    "gemini": 4,
+    "azure": 8,
+    "anthropic": 4,
+    "openrouter": 2,
+    "openai": 8,
+}
+DEFAULT_CONCURRENCY = 4
+
+_provider_semaphores = {}
+_semaphore_lock = threading.Lock()
+
+
+def get_provider_concurrency(llm_provider: str) -> int:
+    """Returns the concurrency limit for a provider, honouring LLM_CONCURRENCY_<PROVIDER>."""
+    env_value = os.getenv(f"LLM_CONCURRENCY_{llm_provider.upper()}")
+    if env_value:
+        try:
+            return max(1, int(env_value))
+        except ValueError:
+            print(f"⚠️ Ignoring invalid LLM_CONCURRENCY_{llm_provider.upper()}={env_value!r}")
+    return PROVIDER_CONCURRENCY.get(llm_provider, DEFAULT_CONCURRENCY)
+
+
+def _get_provider_semaphore(llm_provider: str) -> threading.Semaphore:
+    """Returns the process-wide semaphore that bounds in-flight calls for a provider."""
+    with _semaphore_lock:
+        if llm_provider not in _provider_semaphores:
+            _provider_semaphores[llm_provider] = threading.BoundedSemaphore(get_provider_concurrency(llm_provider))
+        return _provider_semaphores[llm_provider]
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class GenerationEngine:
+    """
+    Fans out per-object generation jobs over a thread pool.
+
+    Every job runs under the provider's semaphore, so the number of concurrent
+    requests to one provider never exceeds its configured limit, even when
+    several engines are active in the same process. Results are always returned
+    in submission order, which keeps the generated documents deterministic.
+    """
+
+    def __init__(self, llm_provider: str, max_workers: int = None):
+        self.llm_provider = llm_provider
+        self.max_workers = max_workers or get_provider_concurrency(llm_provider)
+        self._semaphore = _get_provider_semaphore(llm_provider)
+        self._latencies = []
+        self._latency_lock = threading.Lock()
+        self._started_at = None
+        self._finished_at = None
+
+    def _run_job(self, job):
+        func, args, kwargs = job
+        with self._semaphore:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._latency_lock:
+                    self._latencies.append(elapsed)
+
+    def map(self, func, jobs):
+        """
+        Runs func(*args, **kwargs) for every (args, kwargs) pair in jobs.
+
+        Yields results lazily in the same order as jobs, as soon as each
+        result and all of the results before it are available.
+        """
+        self._started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"llm-{self.llm_provider}") as executor:
+            for result in executor.map(self._run_job, [(func, args, kwargs) for args, kwargs in jobs]):
+                yield result
+        self._finished_at = time.perf_counter()
+
+    def stats(self) -> dict:
+        """Returns throughput and latency statistics for the jobs run so far."""
+        latencies = sorted(self._latencies)
+        end = self._finished_at or time.perf_counter()
+        wall_clock = (end - self._started_at) if self._started_at else 0.0
+        return {
+            "provider": self.llm_provider,
+            "workers": self.max_workers,
+            "objects": len(latencies),
+            "wall_clock_s": wall_clock,
+            "objects_per_s": (len(latencies) / wall_clock) if wall_clock else 0.0,
+            "p50_latency_s": _percentile(latencies, 50),
+            "p95_latency_s": _percentile(latencies, 95),
+        }
+
+    def report(self) -> str:
+        """Formats stats() as a one-line throughput summary."""
+        s = self.stats()
+        return (
+            f"📈 [{s['provider'].upper()}] {s['objects']} objects in {s['wall_clock_s']:.2f}s "
+            f"with {s['workers']} workers: {s['objects_per_s']:.2f} objects/sec, "
+            f"p50 {s['p50_latency_s']:.2f}s, p95 {s['p95_latency_s']:.2f}s"
+        )
@@ -1,19 +1,55 @@
+import importlib
 import os
-import google.generativeai as genai
-import openai
-import anthropic
 from dotenv import load_dotenv
+from client_pool import ClientPool
+from generation_engine import get_provider_concurrency
 
 # Load all environment variables from a .env file
 load_dotenv()
 
+# Model used by each provider. Azure is resolved from its deployment name at call time.
+GEMINI_MODEL = "gemini-1.5-flash"
+ANTHROPIC_MODEL = "claude-3-sonnet-20240229"
+OPENROUTER_MODEL = "mistralai/mistral-small-3.2-24b-instruct:free"
+OPENAI_MODEL = "gpt-4o"
+
+# Overridable so the OpenRouter backend can be pointed at a proxy or a local stub server.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+
+# The _generate_with_* helpers report failures as text rather than raising;
+# these prefixes identify such messages so they are never cached.
+_FAILURE_PREFIXES = ("Description generation failed", "Description could not be generated", "Error:")
+
+# SDK module behind each provider. The SDKs take well over a second to import
+# together, so only the one a run actually uses is imported, on first use.
+PROVIDER_SDKS = {
+    "gemini": "google.generativeai",
+    "azure": "openai",
+    "anthropic": "anthropic",
+    "openrouter": "requests",
+    "openai": "openai",
+}
+
+
+def _load_sdk(llm_provider: str):
+    """Imports and returns the SDK module for a provider, or None if it is not installed."""
+    module_name = PROVIDER_SDKS[llm_provider]
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        print(f"❌ Error: the '{module_name}' package required for {llm_provider} is not installed.")
+        return None
+
 
 def _initialize_gemini():
     """Initializes and returns the Gemini model client."""
+    genai = _load_sdk("gemini")
+    if genai is None:
+        return None
     try:
         api_key = os.environ["GEMINI_API_KEY"]
         genai.configure(api_key=api_key)
-        return genai.GenerativeModel('gemini-1.5-flash')
+        return genai.GenerativeModel(GEMINI_MODEL)
     except KeyError:
         print("❌ Error: GEMINI_API_KEY not found in .env file.")
         return None
@@ -21,6 +57,9 @@ def _initialize_gemini():
 
 def _initialize_azure():
     """Initializes and returns the Azure OpenAI client."""
+    openai = _load_sdk("azure")
+    if openai is None:
+        return None
     try:
         return openai.AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
@@ -35,6 +74,9 @@ def _initialize_azure():
 
 def _initialize_anthropic():
     """Initializes and returns the Anthropic client."""
+    anthropic = _load_sdk("anthropic")
+    if anthropic is None:
+        return None
     try:
         return anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
     except KeyError:
@@ -43,18 +85,30 @@ def _initialize_anthropic():
 
 
 def _initialize_openrouter():
-    """Initializes and returns the OpenRouter API key."""
-    try:
-        api_key = os.getenv("OPEN_ROUTER")
-        if not api_key:
-            raise KeyError("OPEN_ROUTER")
-        return api_key
-    except KeyError:
+    """Initializes and returns a keep-alive requests.Session authorised for OpenRouter."""
+    api_key = os.getenv("OPEN_ROUTER")
+    if not api_key:
         print("❌ Error: OPENROUTER_API_KEY not found in .env file.")
         return None
+    requests = _load_sdk("openrouter")
+    if requests is None:
+        return None
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    })
+    # Enough pooled connections for every request the provider limit lets run at once
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=get_provider_concurrency("openrouter"))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 def _initialize_openai():
     """Initializes and returns the standard OpenAI client."""
+    openai = _load_sdk("openai")
+    if openai is None:
+        return None
     try:
         # The library can infer the key from the environment, but we check explicitly for a better error message.
         if not os.getenv("OPENAI_API_KEY"):
@@ -64,9 +118,19 @@ def _initialize_openai():
         print("❌ Error: OPENAI_API_KEY not found in .env file.")
         return None
 
+# Clients are built once per process and shared by all generation threads.
+CLIENT_POOL = ClientPool({
+    "gemini": _initialize_gemini,
+    "azure": _initialize_azure,
+    "anthropic": _initialize_anthropic,
+    "openrouter": _initialize_openrouter,
+    "openai": _initialize_openai,
+})
+
+
 def _generate_with_gemini(prompt: str) -> str:
     """Generates content using Google Gemini."""
-    model = _initialize_gemini()
+    model = CLIENT_POOL.get("gemini")
     
     if not model:
         return "Description generation failed due to missing Gemini API key."
@@ -80,7 +144,7 @@ def _generate_with_gemini(prompt: str) -> str:
 
 def _generate_with_azure(prompt: str) -> str:
     """Generates content using Azure OpenAI."""
-    azure_client = _initialize_azure()
+    azure_client = CLIENT_POOL.get("azure")
     deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 
     if not azure_client:
@@ -100,12 +164,12 @@ def _generate_with_azure(prompt: str) -> str:
 
 def _generate_with_anthropic(prompt: str) -> str:
     """Generates content using Anthropic Claude."""
-    anthropic_client = _initialize_anthropic()
+    anthropic_client = CLIENT_POOL.get("anthropic")
     if not anthropic_client:
         return "Description generation failed due to missing Anthropic API key."
     try:
         response = anthropic_client.messages.create(
-            model="claude-3-sonnet-20240229",
+            model=ANTHROPIC_MODEL,
             max_tokens=1024,
             messages=[{"role": "user", "content": prompt}]
         )
@@ -114,23 +178,18 @@ def _generate_with_anthropic(prompt: str) -> str:
         return f"Description could not be generated due to an Anthropic API error: {e}"
 
 
-def _generate_with_openrouter(prompt: str, model: str = "mistralai/mistral-small-3.2-24b-instruct:free") -> str:
+def _generate_with_openrouter(prompt: str, model: str = OPENROUTER_MODEL) -> str:
     """Generates content using OpenRouter."""
-    api_key = _initialize_openrouter()
-    if not api_key:
+    session = CLIENT_POOL.get("openrouter")
+    if not session:
         return "Description generation failed due to missing OpenRouter API key."
     try:
-        import requests
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
         payload = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0.7
         }
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
+        response = session.post(f"{OPENROUTER_BASE_URL}/chat/completions", json=payload)
         response.raise_for_status()
         data = response.json()
         return data["choices"][0]["message"]["content"].strip()
@@ -139,13 +198,13 @@ def _generate_with_openrouter(prompt: str, model: str = "mistralai/mistral-small
 
 def _generate_with_openai(prompt: str) -> str:
     """Generates content using OpenAI."""
-    openai_client = _initialize_openai()
+    openai_client = CLIENT_POOL.get("openai")
     if not openai_client:
         return "Description generation failed due to missing OpenAI API key."
 
     try:
         response = openai_client.chat.completions.create(
-            model="gpt-4o",  # You can specify other models like "gpt-3.5-turbo"
+            model=OPENAI_MODEL,  # You can specify other models like "gpt-3.5-turbo"
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
         )
@@ -153,12 +212,21 @@ def _generate_with_openai(prompt: str) -> str:
     except Exception as e:
         return f"Description could not be generated due to an OpenAI API error: {e}"
     
-def generate_business_logic(proc_name: str, params: list, tables: list, sql_code: str, llm_provider: str) -> str:
-    """
-    Crafts a detailed prompt and gets a business logic description from the selected LLM provider.
-    This function acts as a dispatcher based on the user's runtime choice.
-    """
-    prompt = f"""
+def get_model_name(llm_provider: str) -> str:
+    """Returns the model (or Azure deployment) that a provider will be called with."""
+    if llm_provider == "azure":
+        return os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "")
+    return {
+        "gemini": GEMINI_MODEL,
+        "anthropic": ANTHROPIC_MODEL,
+        "openrouter": OPENROUTER_MODEL,
+        "openai": OPENAI_MODEL,
+    }.get(llm_provider, "")
+
+
+def build_business_logic_prompt(proc_name: str, params: list, tables: list, sql_code: str) -> str:
+    """Crafts the business logic prompt for a procedure, function or trigger."""
+    return f"""
     You are a Senior Business Analyst with deep SQL expertise. Your task is to analyze the provided SQL stored procedure and write a comprehensive, easy-to-understand description of its business logic for a non-technical audience.
 
     **CONTEXT:**
@@ -182,15 +250,45 @@ def generate_business_logic(proc_name: str, params: list, tables: list, sql_code
 
     """
 
-    if llm_provider == "azure":
-        return _generate_with_azure(prompt)
-    elif llm_provider == "anthropic":
-        return _generate_with_anthropic(prompt)
-    elif llm_provider == "gemini":
-        return _generate_with_gemini(prompt)
-    elif llm_provider == "openai": # 👈 ADDED THIS NEW PROVIDER
-        return _generate_with_openai(prompt)
-    elif llm_provider == "openrouter":
-        return _generate_with_openrouter(prompt)
-    else:
+
+# Provider name -> backend. Adding a provider means one _generate_with_* function,
+# one entry here and its SDK in PROVIDER_SDKS.
+PROVIDERS = {
+    "gemini": _generate_with_gemini,
+    "azure": _generate_with_azure,
+    "anthropic": _generate_with_anthropic,
+    "openrouter": _generate_with_openrouter,
+    "openai": _generate_with_openai,
+}
+
+
+def _dispatch(prompt: str, llm_provider: str) -> str:
+    """Sends a prompt to the selected LLM provider."""
+    backend = PROVIDERS.get(llm_provider)
+    if backend is None:
         return "Error: Unknown LLM provider specified."
+    return backend(prompt)
+
+
+def generate_business_logic(proc_name: str, params: list, tables: list, sql_code: str, llm_provider: str, cache=None) -> str:
+    """
+    Crafts a detailed prompt and gets a business logic description from the selected LLM provider.
+    This function acts as a dispatcher based on the user's runtime choice.
+
+    If an LLMCache is given, a previously generated description for the exact
+    same prompt, provider and model is returned without calling the provider.
+    """
+    prompt = build_business_logic_prompt(proc_name, params, tables, sql_code)
+    if cache is None:
+        return _dispatch(prompt, llm_provider)
+
+    model = get_model_name(llm_provider)
+    key = cache.make_key(prompt, llm_provider, model)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    description = _dispatch(prompt, llm_provider)
+    if not description.startswith(_FAILURE_PREFIXES):
+        cache.put(key, llm_provider, model, description)
+    return description
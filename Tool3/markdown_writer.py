@@ -0,0 +1,206 @@
+import json
+import os
+import re
+
+PARTIAL_SUFFIX = ".partial"
+JOURNAL_SUFFIX = ".journal"
+MANIFEST_NAME = "index.json"
+
+
+def _read_journal(journal_path, fingerprint):
+    """Returns the entries of a journal written for fingerprint, or None to start over."""
+    if not os.path.exists(journal_path):
+        return None
+    entries = []
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # The run stopped while writing this line
+                break
+    if not entries or entries[0].get("fingerprint") != fingerprint:
+        return None
+    return entries
+
+
+def _open_journal(journal_path, entries):
+    # Rewritten in full, which also drops a line cut off by the interruption
+    journal = open(journal_path, "w", encoding="utf-8")
+    for entry in entries:
+        _log(journal, entry)
+    return journal
+
+
+def _log(journal, entry):
+    journal.write(json.dumps(entry) + "\n")
+    journal.flush()
+
+
+def _write_atomic(path, data: bytes):
+    temp_path = path + PARTIAL_SUFFIX
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class MarkdownWriter:
+    """
+    Writes a Markdown document section by section.
+
+    Everything goes to <output>.partial first, and the finished file is moved
+    onto <output> in one os.replace, so readers never see half a document.
+    After each section the partial file is flushed to disk and its size is
+    appended to <output>.journal. If the run is interrupted, a later writer
+    for the same output and fingerprint truncates the partial file to the
+    last journaled section, and completed lists the sections it already
+    holds so the caller can carry on from there. A different fingerprint
+    (e.g. the index or SQL changed) starts the document over. Journaling
+    stops at the first section written with failed=True, so a resumed run
+    regenerates it and everything after it.
+    """
+
+    def __init__(self, output_path: str, fingerprint: str, resume: bool = True):
+        self.output_path = output_path
+        self.partial_path = output_path + PARTIAL_SUFFIX
+        self.journal_path = output_path + JOURNAL_SUFFIX
+        self.fingerprint = fingerprint
+        self.completed = []
+        self._file = None
+        self._journal = None
+        self._journaling = True
+
+        entries = _read_journal(self.journal_path, fingerprint) if resume else None
+        offset = entries[-1].get("offset", 0) if entries else 0
+        if entries is not None and (not os.path.exists(self.partial_path)
+                                    or os.path.getsize(self.partial_path) < offset):
+            entries = None
+        if entries is None:
+            self._file = open(self.partial_path, "wb")
+            entries = [{"fingerprint": fingerprint}]
+        else:
+            self._file = open(self.partial_path, "r+b")
+            self._file.truncate(offset)
+            self._file.seek(offset)
+            self.completed = [entry["key"] for entry in entries[1:]]
+            print(f"⏩ Resuming {output_path} after {len(self.completed)} completed sections")
+        self._journal = _open_journal(self.journal_path, entries)
+        self._written = bool(self.completed)
+
+    def write(self, text: str, key: str, failed: bool = False, **meta):
+        """
+        Appends the section named key and records it as done, unless failed.
+
+        Sections are separated by a blank line. The journal only covers a
+        prefix of the file, so after a failed section later ones are written
+        but not recorded either. meta (title, anchor, ...) only matters to
+        ShardedMarkdownWriter's manifest.
+        """
+        if self._written:
+            text = "\n" + text
+        self._file.write(text.encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._written = True
+        self._journaling = self._journaling and not failed
+        if self._journaling:
+            _log(self._journal, {"key": key, "offset": self._file.tell()})
+            self.completed.append(key)
+
+    def commit(self):
+        """Moves the finished document into place and removes the journal."""
+        self.close()
+        os.replace(self.partial_path, self.output_path)
+        os.remove(self.journal_path)
+
+    def close(self):
+        """Closes the files, leaving the partial document and journal for a resumed run."""
+        for f in (self._file, self._journal):
+            if f is not None and not f.closed:
+                f.close()
+
+
+class ShardedMarkdownWriter:
+    """
+    Writes each section to its own file in output_dir, plus an index.json manifest.
+
+    Same interface and resume behaviour as MarkdownWriter (including failed
+    sections); each file is replaced atomically as its section completes. The manifest lists every
+    section in order with its file, size in bytes and the meta passed to
+    write(), so a reader can show a table of contents and load one section
+    at a time. It is written last, and files of a previous run that are no
+    longer listed are removed then.
+    """
+
+    def __init__(self, output_dir: str, fingerprint: str, resume: bool = True):
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.journal_path = os.path.join(output_dir, MANIFEST_NAME + JOURNAL_SUFFIX)
+        self.fingerprint = fingerprint
+        os.makedirs(output_dir, exist_ok=True)
+
+        entries = _read_journal(self.journal_path, fingerprint) if resume else None
+        if entries is not None and not all(os.path.exists(os.path.join(output_dir, entry["file"]))
+                                           for entry in entries[1:]):
+            entries = None
+        if entries is None:
+            entries = [{"fingerprint": fingerprint}]
+        elif len(entries) > 1:
+            print(f"⏩ Resuming {output_dir} after {len(entries) - 1} completed sections")
+        self.sections = entries[1:]
+        self.completed = [entry["key"] for entry in self.sections]
+        self._files = {entry["file"] for entry in self.sections}
+        self._journal = _open_journal(self.journal_path, entries)
+        self._journaling = True
+
+    def _file_name(self, key):
+        """summary / procedure:dbo.usp X -> summary.md / procedure-dbo.usp-x.md, unique even on case-insensitive disks."""
+        stem = re.sub(r"[^a-z0-9_.-]+", "-", key.lower()).strip("-.") or "section"
+        name, n = f"{stem}.md", 1
+        while name in self._files:
+            n += 1
+            name = f"{stem}-{n}.md"
+        return name
+
+    def write(self, text: str, key: str, failed: bool = False, **meta):
+        """
+        Writes the section named key to its own file and records it as done, unless failed.
+
+        As with MarkdownWriter, sections after a failed one are not recorded
+        either, so a resumed run rewrites them in order.
+        """
+        data = text.encode("utf-8")
+        entry = {"key": key, "file": self._file_name(key), "bytes": len(data), **meta}
+        _write_atomic(os.path.join(self.output_dir, entry["file"]), data)
+        self._files.add(entry["file"])
+        self.sections.append(entry)
+        self._journaling = self._journaling and not failed
+        if self._journaling:
+            _log(self._journal, entry)
+            self.completed.append(key)
+
+    def commit(self):
+        """Writes the manifest, removes sections left over from a previous run and the journal."""
+        self.close()
+        stale = set()
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    stale = {entry["file"] for entry in json.load(f).get("sections", [])}
+            except (OSError, ValueError, KeyError):
+                pass
+        manifest = {"fingerprint": self.fingerprint, "sections": self.sections,
+                    "total_bytes": sum(entry["bytes"] for entry in self.sections)}
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+        for name in stale - self._files:
+            path = os.path.join(self.output_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        os.remove(self.journal_path)
+
+    def close(self):
+        """Closes the journal, leaving it for a resumed run."""
+        if not self._journal.closed:
+            self._journal.close()
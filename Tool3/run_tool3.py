@@ -1,10 +1,27 @@
 import os
 import json
+import argparse
 from logging_styles import Colours
 from doc_generator import generate_docs, prompt_for_llm_provider
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Markdown documentation for procedures, functions and triggers.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker threads for LLM requests. In-flight requests per provider are still capped "
+                             "by LLM_CONCURRENCY_<PROVIDER> (see generation_engine.py).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Regenerate every description instead of reusing cached ones from output/.cache.")
+    parser.add_argument("--restart", action="store_true",
+                        help="Start the document over instead of resuming an interrupted run.")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Write one file per object plus an index.json manifest to output/documents/procedures1/.")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     # Define file paths
     input_dir = "input/index"
     document_dir = "output/documents"
@@ -14,7 +31,9 @@ def main():
     try:
         print(Colours.YELLOW + "Generating Markdown documentation..." + Colours.RESET)
         llm_choice = prompt_for_llm_provider()
-        generate_docs(index_path, output_dir=document_dir, output_file="procedures1.md", llm_provider=llm_choice)
+        generate_docs(index_path, output_dir=document_dir, output_file="procedures1.md", llm_provider=llm_choice,
+                      max_workers=args.workers, use_cache=not args.no_cache, resume=not args.restart,
+                      sharded=args.sharded)
         print(Colours.GREEN + "Documentation generated in 'document/procedures1.md'" + Colours.RESET)
     except Exception as e:
         print(Colours.RED + f"Error generating documentation: {e}" + Colours.RESET)
@@ -0,0 +1,295 @@
+import re
+import string
+
+# Procedure / function / trigger definitions split out of a T-SQL script in one
+# pass. Comments, string literals and quoted identifiers are skipped, so
+# keywords inside them never count, and BEGIN ... END nesting (including
+# CASE ... END and BEGIN TRY / CATCH) is tracked so a body is not cut at its
+# first inner END. BEGIN TRAN / TRANSACTION / DISTRIBUTED / DIALOG /
+# CONVERSATION start statements, not blocks, and END CONVERSATION is skipped.
+#
+# The script is read in chunks of whole lines. Each chunk is upper-cased once
+# and searched with a single alternation of literal tokens, which the regex
+# engine scans far faster than keyword patterns with look-arounds; word
+# boundaries are then checked on the characters either side of a match.
+
+SECTIONS = {"procedure": "procedures", "function": "functions", "trigger": "triggers"}
+_KINDS = {"PROC": "procedure", "PROCEDURE": "procedure", "FUNCTION": "function", "TRIGGER": "trigger"}
+
+_NAME_PART = r'(?:\[[^\]]+\]|"[^"]+"|[A-Za-z_@#][\w@#$]*)'
+# Whitespace, or a line comment, between header keywords
+_GAP = r"(?:\s|--[^\n]*)"
+_HEADER_RE = re.compile(
+    rf"(?:CREATE(?:{_GAP}+OR{_GAP}+ALTER)?|ALTER){_GAP}+(PROCEDURE|PROC|FUNCTION|TRIGGER){_GAP}+"
+    rf"({_NAME_PART}(?:\s*\.\s*{_NAME_PART}){{0,2}})",
+    re.IGNORECASE,
+)
+# Only header keywords left in the chunk: the name follows in the next one
+_PARTIAL_HEADER_RE = re.compile(rf"(?:{_GAP}+(?:OR|ALTER|PROCEDURE|PROC|FUNCTION|TRIGGER)(?![\w@#$]))*{_GAP}*\Z")
+
+_TOKENS = r"--|/\*|'|\[|\"|CREATE|ALTER|BEGIN|CASE|END|GO"
+_TOKEN_RE = re.compile(_TOKENS)
+_HEADER_TOKEN_RE = re.compile(_TOKENS + r"|AS|EXECUTE|EXEC")
+_WORD_CHARS = frozenset(string.ascii_uppercase + string.digits + "_@#$")
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+_NOT_BLOCK_RE = re.compile(rf"{_GAP}*(?:TRAN|TRANSACTION|DISTRIBUTED|DIALOG|CONVERSATION)(?![\w@#$])")
+_END_STATEMENT_RE = re.compile(r"\s+CONVERSATION(?![\w@#$])")
+_BLOCK_COMMENT_RE = re.compile(r"/\*|\*/")
+_GO_TAIL_RE = re.compile(r"(?:[ \t]+\d+)?[ \t]*;?[ \t\r]*(?:--[^\n]*)?(?=\n|\Z)")
+_SPACE_RE = re.compile(r"\s*")
+_TAIL_GAP_RE = re.compile(rf"{_GAP}*\Z")
+
+# Characters read per chunk (extended to the end of the line)
+_CHUNK_CHARS = 1 << 20
+
+# Scanner states
+_OUTSIDE, _HEADER, _AWAIT_BODY, _BLOCK, _STATEMENTS = range(5)
+
+
+def normalize_name(name: str) -> str:
+    """dbo.[usp X] / "dbo"."x" -> dbo.usp X / dbo.x"""
+    parts = re.findall(_NAME_PART, name)
+    return ".".join(p[1:-1] if p[0] in '["' else p for p in parts)
+
+
+def _is_word(ch: str) -> bool:
+    return ch in _WORD_CHARS or (ch > "\x7f" and ch.isalnum())
+
+
+def _finish(current, tail):
+    current["parts"].append(tail)
+    return {"type": current["type"], "name": current["name"], "sql": "".join(current["parts"]).strip(),
+            "line": current["line"]}
+
+
+def _line_chunks(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= _CHUNK_CHARS:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _file_chunks(f):
+    while True:
+        chunk = f.read(_CHUNK_CHARS)
+        if not chunk:
+            return
+        yield chunk + f.readline()
+
+
+def iter_sql_objects(lines):
+    """
+    Yields every procedure, function and trigger defined in a T-SQL script.
+
+    lines is any iterable of lines with their line endings (an open file is
+    read lazily, so memory is bounded by about a megabyte plus the largest
+    object). Each result is a dict with type ("procedure" / "function" /
+    "trigger"), name (schema-qualified as written, without brackets), sql
+    (from CREATE to the END closing the body, or to the next GO for bodies
+    without BEGIN) and line (1-based start line).
+    """
+    return _scan(_line_chunks(lines))
+
+
+def _scan(chunks):
+    state = _OUTSIDE
+    depth = 0
+    comment_depth = 0
+    in_string = False
+    after_execute = False
+    current = None
+    line_no = 1
+    carry = ""
+    chunks = iter(chunks)
+    text = next(chunks, None)
+
+    while text is not None:
+        following = next(chunks, None)
+        final = following is None
+        text = carry + text
+        upper = text.upper()
+        if len(upper) != len(text):
+            # Some characters (e.g. the German sharp s) upper-case to two
+            upper = text.translate(_ASCII_UPPER)
+        n = len(text)
+        pos = 0
+        # Start of the current object's text, end of what this chunk handles
+        # (the rest is carried into the next one) and where line_no applies
+        seg, done, counted = 0, n, 0
+
+        while pos < n:
+            if comment_depth:
+                m = _BLOCK_COMMENT_RE.search(text, pos)
+                if m is None:
+                    break
+                comment_depth += 1 if m.group() == "/*" else -1
+                pos = m.end()
+                continue
+            if in_string:
+                i = text.find("'", pos)
+                if i < 0:
+                    break
+                if text.startswith("'", i + 1):
+                    pos = i + 2
+                    continue
+                in_string = False
+                pos = i + 1
+                continue
+            if state == _AWAIT_BODY:
+                pos = _SPACE_RE.match(upper, pos).end()
+                if pos == n:
+                    break
+                if not upper.startswith(("--", "/*", "BEGIN"), pos):
+                    state = _STATEMENTS
+
+            m = (_HEADER_TOKEN_RE if state == _HEADER else _TOKEN_RE).search(upper, pos)
+            if m is None:
+                break
+            start, pos = m.span()
+            token = m.group()
+
+            if token == "--":
+                i = upper.find("\n", pos)
+                pos = n if i < 0 else i
+                continue
+            if token == "/*":
+                comment_depth = 1
+                continue
+            if token == "'":
+                in_string = True
+                continue
+            if token == "[" or token == '"':
+                close = "]" if token == "[" else '"'
+                i = upper.find(close, pos)
+                while i >= 0 and upper.startswith(close, i + 1):
+                    i = upper.find(close, i + 2)
+                # Identifiers stay on one line; otherwise it is a stray character
+                if i >= 0 and upper.find("\n", pos, i) < 0:
+                    pos = i + 1
+                continue
+
+            if (start and (_is_word(upper[start - 1]) or upper[start - 1] == ".")) or (pos < n and _is_word(upper[pos])):
+                continue
+
+            if token == "GO":
+                line_start = upper.rfind("\n", 0, start) + 1
+                if upper[line_start:start].strip() or not _GO_TAIL_RE.match(upper, pos):
+                    continue
+                if current is not None:
+                    yield _finish(current, text[seg:line_start])
+                    current = None
+                state, depth = _OUTSIDE, 0
+                pos = _GO_TAIL_RE.match(upper, pos).end()
+                continue
+            if token == "CREATE" or token == "ALTER":
+                header = _HEADER_RE.match(text, start)
+                if header is None:
+                    if not final and _PARTIAL_HEADER_RE.match(upper, pos):
+                        # "CREATE PROCEDURE" ends the chunk; read it again with the name
+                        done = start
+                        break
+                    continue
+                if current is not None:
+                    # A new definition ends a body that had no BEGIN (or a malformed one)
+                    yield _finish(current, text[seg:start])
+                line_no += text.count("\n", counted, start)
+                counted = start
+                current = {"type": _KINDS[header.group(1).upper()], "name": normalize_name(header.group(2)),
+                           "line": line_no, "parts": []}
+                seg = start
+                # Skip the header keywords so "OR ALTER" is not read as another definition
+                pos = header.end()
+                state, depth, after_execute = _HEADER, 0, False
+                continue
+            if state == _OUTSIDE:
+                continue
+            if state == _HEADER:
+                if token == "AS":
+                    if after_execute:
+                        # WITH EXECUTE AS OWNER: not the AS that starts the body
+                        after_execute = False
+                    else:
+                        state = _AWAIT_BODY
+                elif token in ("EXEC", "EXECUTE"):
+                    after_execute = True
+                continue
+
+            if token == "BEGIN":
+                if not final and _TAIL_GAP_RE.match(upper, pos):
+                    # The word deciding BEGIN TRAN vs. a block is in the next chunk
+                    done = start
+                    break
+                opens_block = not _NOT_BLOCK_RE.match(upper, pos)
+                if state == _AWAIT_BODY:
+                    state, depth = (_BLOCK, 1) if opens_block else (_STATEMENTS, 0)
+                elif opens_block:
+                    depth += 1
+                continue
+            if token == "CASE":
+                depth += 1
+                continue
+            if token == "END":
+                if _END_STATEMENT_RE.match(upper, pos):
+                    continue
+                depth -= 1
+                if state == _BLOCK and depth == 0:
+                    yield _finish(current, text[seg:pos])
+                    current = None
+                    state = _OUTSIDE
+                continue
+
+        if current is not None:
+            current["parts"].append(text[seg:done])
+        line_no += text.count("\n", counted, done)
+        carry = text[done:]
+        text = following
+
+    if current is not None:
+        yield _finish(current, "")
+
+
+def _open_sql(path):
+    """Opens a script as text, honouring a UTF-16 or UTF-8 byte order mark (SSMS exports are often UTF-16)."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        encoding = "utf-16"
+    elif head[:3] == b"\xef\xbb\xbf":
+        encoding = "utf-8-sig"
+    else:
+        encoding = "utf-8"
+    return open(path, "r", encoding=encoding, errors="replace")
+
+
+def scan_sql_file(path):
+    """iter_sql_objects over a file on disk, read in chunks."""
+    with _open_sql(path) as f:
+        yield from _scan(_file_chunks(f))
+
+
+def group_sql_objects(objects) -> dict:
+    """
+    Groups scanned objects into {"procedures": {...}, "functions": {...}, "triggers": {...}}.
+
+    Each object is stored under its name as written and, unless that would
+    clash, also without the schema, so index entries such as usp_WriteAudit
+    find dbo.usp_WriteAudit. A later definition of the same name wins.
+    """
+    results = {section: {} for section in SECTIONS.values()}
+    short_names = {section: {} for section in SECTIONS.values()}
+    for obj in objects:
+        section = SECTIONS[obj["type"]]
+        results[section][obj["name"]] = obj["sql"]
+        short = obj["name"].rsplit(".", 1)[-1]
+        if short != obj["name"]:
+            short_names[section][short] = obj["sql"]
+    for section, names in short_names.items():
+        for short, sql in names.items():
+            results[section].setdefault(short, sql)
+    return results
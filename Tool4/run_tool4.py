@@ -65,15 +65,38 @@
 
 
 import os
+import argparse
 from src.analyze_lineage import analyze_lineage
 from src.validation_script import validate
 from src.logging_styles import Colours
-from src.generate_mermaid import generate_lineage_diagram
+from src.generate_mermaid import generate_lineage_diagram, generate_sharded_diagrams, DEFAULT_MAX_NODES, DEFAULT_MAX_EDGES
 from src.convert_mmd_to_md import convert_mmd_to_md
-
+from src.schema_registry import format_validation_timings
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Validate the index/AST inputs and generate lineage JSON and Mermaid diagrams.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-analyze AST objects that changed since the last run (state kept in output/.cache).")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Read ast.json one object at a time instead of loading it whole (for very large AST dumps).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Analyze AST objects on a process pool of N workers (default: 1, serial).")
+    parser.add_argument("--max-errors", type=int, default=None,
+                        help="Report up to N schema errors per input file instead of only the most relevant one.")
+    parser.add_argument("--shard", choices=["component", "schema"],
+                        help="Also write the diagram as size-capped shards (one .mmd each plus index.json), "
+                             "grouped by connected component or by schema.")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES,
+                        help=f"Node cap per diagram shard (default: {DEFAULT_MAX_NODES}).")
+    parser.add_argument("--max-edges", type=int, default=DEFAULT_MAX_EDGES,
+                        help=f"Edge cap per diagram shard (default: {DEFAULT_MAX_EDGES}).")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+
     # Define file paths
     input_dir = "input"
     output_dir = "output"
@@ -85,7 +108,7 @@ def main():
 
     # ✅ Validation before running Tool 4
     print(Colours.YELLOW + "Validating index.json and ast.json against schemas..." + Colours.RESET)
-    if not validate(index_path, ast_path):
+    if not validate(index_path, ast_path, streaming=args.streaming, max_errors=args.max_errors):
         print(Colours.RED + "Validation failed. Exiting tool." + Colours.RESET)
         return
 
@@ -93,7 +116,8 @@ def main():
 
     # ✅ Tool 4: Data Lineage Analysis
     print(Colours.GREEN + "Starting Data Lineage Analysis..." + Colours.RESET)
-    analyze_lineage(index_path, ast_path, output_path)
+    analyze_lineage(index_path, ast_path, output_path, incremental=args.incremental, streaming=args.streaming,
+                    workers=args.workers)
     print(Colours.GREEN + "Data Lineage Analysis complete." + Colours.RESET)
 
     # --- ADDED: Call the Mermaid diagram generation script ---
@@ -107,7 +131,11 @@ def main():
     generate_lineage_diagram(output_path, mermaid_output_path)
     # The success message is printed from within the generate_mermaid function.
     convert_mmd_to_md(mermaid_output_path, markdown_path)
+    if args.shard:
+        generate_sharded_diagrams(output_path, os.path.join(diagrams_dir, "lineage_diagram3_shards"), by=args.shard,
+                                  max_nodes=args.max_nodes, max_edges=args.max_edges)
 #     print(Colours.GREEN + "Mermaid diagram and Markdown generated." + Colours.RESET)
+    print(Colours.BLUE + format_validation_timings() + Colours.RESET)
 
 
 if __name__ == "__main__":
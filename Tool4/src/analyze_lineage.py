@@ -1,8 +1,16 @@
 import json
-from collections import defaultdict
-import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import os
+import time
 import jsonschema
+from src.ast_stream import iter_ast_objects
+from src.column_index import ColumnUsageIndex
+from src.schema_registry import SCHEMA_DIR, validate_instance
+from src.sql_extraction import (
+    normalize_name, extract_referenced_columns, extract_calls_from_expression, extract_column_alias
+)
 
 # A simple class to hold color codes for terminal output.
 # If the dependency is not available, it will default to no color.
@@ -14,185 +22,273 @@ except ImportError:
     class Colours:
         YELLOW, RESET, GREEN, RED = "", "", "", ""
 
-def analyze_lineage(index_file: str, ast_file: str, output_file: str):
-    SQL_KEYWORDS = {
-        'SELECT', 'FROM', 'WHERE', 'INSERT', 'INTO', 'VALUES', 'UPDATE', 'SET', 'DELETE',
-        'JOIN', 'INNER', 'LEFT', 'RIGHT', 'OUTER', 'ON', 'GROUP', 'BY', 'ORDER', 'HAVING',
-        'AS', 'DISTINCT', 'TOP', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AND', 'OR', 'NOT',
-        'CREATE', 'TABLE', 'PROCEDURE', 'FUNCTION', 'TRIGGER', 'VIEW', 'INDEX', 'ALTER',
-        'DROP', 'TRUNCATE', 'DECLARE', 'EXEC', 'EXECUTE', 'CURSOR', 'FOR', 'OPEN', 'FETCH',
-        'CLOSE', 'DEALLOCATE', 'BEGIN', 'COMMIT', 'ROLLBACK', 'TRANSACTION', 'GO', 'PRINT',
-        'SUM', 'AVG', 'MAX', 'MIN', 'COUNT', 'CAST', 'CONVERT', 'GETDATE', 'YEAR', 'OVER',
-        'PARTITION', 'ROWS', 'BETWEEN', 'UNBOUNDED', 'PRECEDING', 'CURRENT', 'ROW', 'IS', 'NULL',
-        'RAISERROR', 'RETURN', 'WHILE', 'WITH', 'CTE', 'IN'
+# Bump whenever the statement walk changes, so persisted per-object results
+# computed by an older analyzer are not reused.
+LINEAGE_STATE_VERSION = 1
+
+
+def fingerprint_ast_object(ast_obj: dict) -> str:
+    """Returns a stable content hash of a single procedure/function/trigger AST entry."""
+    canonical = json.dumps(ast_obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def default_state_path(output_file: str) -> str:
+    """Location of the incremental state for a lineage output file (output/.cache/<name>.state.json)."""
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    return os.path.join(output_dir, ".cache", f"{stem}.state.json")
+
+
+def load_lineage_state(state_file: str) -> dict:
+    """Loads persisted per-object contributions, or returns {} if they are missing or stale."""
+    try:
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if state.get("version") != LINEAGE_STATE_VERSION:
+        return {}
+    return state.get("objects", {})
+
+
+def save_lineage_state(state_file: str, objects: dict):
+    """Persists per-object fingerprints and contributions, writing via a temp file."""
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_path = state_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": LINEAGE_STATE_VERSION, "objects": objects}, f)
+    os.replace(tmp_path, state_file)
+
+
+def get_strings_from_node(node):
+    """Recursively extracts all string values from a nested AST node."""
+    strings = []
+    if isinstance(node, dict):
+        for value in node.values():
+            strings.extend(get_strings_from_node(value))
+    elif isinstance(node, list):
+        for item in node:
+            strings.extend(get_strings_from_node(item))
+    elif isinstance(node, str):
+        strings.append(node)
+    return strings
+
+def process_expression_condition(proc, expr, table_usage, lineage):
+    if isinstance(expr, str):
+        for called_obj in extract_calls_from_expression(expr):
+            if called_obj != proc: lineage[proc]["calls"].add(called_obj)
+        return
+    if not isinstance(expr, dict): return
+
+    if "op" in expr:
+        process_expression_condition(proc, expr.get("left"), table_usage, lineage)
+        process_expression_condition(proc, expr.get("right"), table_usage, lineage)
+
+def process_statements(proc: str, stmts: list, table_usage: defaultdict, lineage: defaultdict, cte_names=None):
+    if not stmts: return
+    if cte_names is None: cte_names = set()
+
+    for stmt in stmts:
+        stmt_type = stmt.get("type", "").upper()
+
+        if stmt_type == "EXECUTE_PROCEDURE":
+            if proc_name := stmt.get("name"):
+                # CHANGED: Add normalized name.
+                lineage[proc]["calls"].add(normalize_name(proc_name))
+
+        elif stmt_type == "SET" and "value" in stmt:
+            process_expression_condition(proc, stmt["value"], table_usage, lineage)
+
+        elif stmt_type == "WITH_CTE":
+            local_cte_names = {cte.get("name") for cte in stmt.get("cte_list", [])}
+            for cte in stmt.get("cte_list", []):
+                if "query" in cte and isinstance(query := cte.get("query"), dict):
+                    process_statements(proc, [query], table_usage, lineage, cte_names | local_cte_names)
+            if "main_query" in stmt and isinstance(main_query := stmt.get("main_query"), dict):
+                process_statements(proc, [main_query], table_usage, lineage, cte_names | local_cte_names)
+
+        elif stmt_type == "DECLARE_CURSOR":
+            if "select_statement" in stmt and isinstance(cursor_query := stmt.get("select_statement"), dict):
+                process_statements(proc, [cursor_query], table_usage, lineage, cte_names)
+
+        elif stmt_type in ("SELECT", "SELECT_INTO"):
+            query_obj = stmt if stmt_type == "SELECT" else stmt.get("query", {})
+
+            if isinstance(query_obj, dict):
+                from_clause = query_obj.get("from")
+                tables = [from_clause] if isinstance(from_clause, str) else []
+
+                strings_to_analyze = []
+                strings_to_analyze.extend(query_obj.get("columns", []))
+                strings_to_analyze.extend(get_strings_from_node(query_obj.get("where", {})))
+                full_query_str = " ".join(strings_to_analyze)
+
+                aliases = {
+                    alias
+                    for col_expr in query_obj.get("columns", [])
+                    if (alias := extract_column_alias(col_expr))
+                }
+
+                objects_to_exclude = set(tables) | cte_names | aliases
+                columns = extract_referenced_columns(full_query_str, objects_to_exclude)
+
+                for table_name in tables:
+                    if table_name and table_name not in ["DUMMY_TABLE", "NO_TABLE"] and table_name not in cte_names:
+                        # CHANGED: Use normalized table names for keys.
+                        norm_table = normalize_name(table_name)
+                        lineage[norm_table]["type"] = "table"
+                        table_usage[norm_table][proc].append({"op": "read", "cols": columns})
+
+        # --- MODIFIED BLOCK FOR UPDATE ---
+        elif stmt_type == "UPDATE":
+            if table_name := stmt.get("table"):
+                # CHANGED: Use normalized table names.
+                norm_table = normalize_name(table_name)
+                lineage[norm_table]["type"] = "table"
+
+                # Get columns being written to (in the SET clause)
+                set_cols = list(stmt.get("set", {}).keys())
+                if set_cols:
+                    table_usage[norm_table][proc].append({"op": "write", "cols": sorted(set_cols)})
+
+                # Get columns being read from (in WHERE and SET values)
+                where_strings = get_strings_from_node(stmt.get("where", {}))
+                set_value_strings = get_strings_from_node(list(stmt.get("set", {}).values()))
+                read_strings = " ".join(where_strings + set_value_strings)
+
+                # Exclude the table itself and written columns to find read columns
+                read_cols = extract_referenced_columns(read_strings, {norm_table} | set(set_cols))
+
+                if read_cols and read_cols != ['*']:
+                    table_usage[norm_table][proc].append({"op": "read", "cols": read_cols})
+        # --- END MODIFIED BLOCK FOR UPDATE ---
+
+        elif stmt_type == "INSERT":
+            if table_name := stmt.get("table"):
+                # CHANGED: Use normalized table names.
+                norm_table = normalize_name(table_name)
+                columns = stmt.get("columns", ["*"])
+                lineage[norm_table]["type"] = "table"
+                table_usage[norm_table][proc].append({"op": "write", "cols": columns})
+            if "select_statement" in stmt:
+                process_statements(proc, [stmt["select_statement"]], table_usage, lineage, cte_names)
+
+        elif stmt_type == "DELETE":
+            if table_name := stmt.get("table"):
+                # CHANGED: Use normalized table names.
+                norm_table = normalize_name(table_name)
+                where_strings = get_strings_from_node(stmt.get("where", {}))
+                columns = extract_referenced_columns(" ".join(where_strings), {norm_table})
+                lineage[norm_table]["type"] = "table"
+                table_usage[norm_table][proc].append({"op": "write", "cols": columns})
+
+        if "condition" in stmt:
+            process_expression_condition(proc, stmt["condition"], table_usage, lineage)
+        for key in ["then", "else", "body"]:
+            if key in stmt and isinstance(stmt.get(key), list):
+                process_statements(proc, stmt[key], table_usage, lineage, cte_names)
+
+
+def analyze_object(name: str, ast: dict) -> dict:
+    """Walks one object's statements and returns its JSON-serializable lineage contribution."""
+    obj_lineage = defaultdict(lambda: {"type": "", "calls": set()})
+    obj_usage = defaultdict(lambda: defaultdict(list))
+    process_statements(name, ast.get("statements", []), obj_usage, obj_lineage)
+    return {
+        "calls": sorted(obj_lineage[name]["calls"]) if name in obj_lineage else [],
+        "tables": [t for t, meta in obj_lineage.items() if meta.get("type") == "table"],
+        "usage": {t: callers[name] for t, callers in obj_usage.items() if name in callers},
     }
 
-    # CHANGED: Added a helper to ensure all object names are schema-qualified.
-    def normalize_name(name):
-        """Ensure object name has a schema, defaulting to 'dbo'."""
-        if not isinstance(name, str) or '.' in name or not name:
-            return name
-        if name.upper() in SQL_KEYWORDS or name.startswith('@'):
-            return name
-        return f"dbo.{name}"
-
-    def get_strings_from_node(node):
-        """Recursively extracts all string values from a nested AST node."""
-        strings = []
-        if isinstance(node, dict):
-            for value in node.values():
-                strings.extend(get_strings_from_node(value))
-        elif isinstance(node, list):
-            for item in node:
-                strings.extend(get_strings_from_node(item))
-        elif isinstance(node, str):
-            strings.append(node)
-        return strings
-
-    def extract_referenced_columns(sql_string: str, objects_to_exclude: set):
-        """Extracts potential column names from a targeted SQL string."""
-        if not sql_string: return ["*"]
-        
-        # CHANGED: Normalize excluded objects to ensure accurate filtering.
-        normalized_exclude = {normalize_name(o) for o in objects_to_exclude}
-        
-        potential_identifiers = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', sql_string)
-        
-        actual_columns = {
-            col for col in potential_identifiers 
-            if col.upper() not in SQL_KEYWORDS 
-            and not col.startswith('@')
-            and col not in normalized_exclude
-            and normalize_name(col) not in normalized_exclude
-        }
-        return sorted(list(actual_columns)) or ["*"]
-
-    def extract_calls_from_expression(expression):
-        if not isinstance(expression, str): return []
-        pattern = r'\b((?:[a-zA-Z0-9_]+\.)?[a-zA-Z0-9_]+)\s*\('
-        calls = re.findall(pattern, expression)
-        # CHANGED: Return full, normalized names instead of stripping schemas.
-        return list(set([normalize_name(c) for c in calls]))
-
-    def process_expression_condition(proc, expr, table_usage, lineage):
-        if isinstance(expr, str):
-            for called_obj in extract_calls_from_expression(expr):
-                if called_obj != proc: lineage[proc]["calls"].add(called_obj)
-            return
-        if not isinstance(expr, dict): return
-
-        if "op" in expr:
-            process_expression_condition(proc, expr.get("left"), table_usage, lineage)
-            process_expression_condition(proc, expr.get("right"), table_usage, lineage)
-
-    def process_statements(proc: str, stmts: list, table_usage: defaultdict, lineage: defaultdict, cte_names=None):
-        if not stmts: return
-        if cte_names is None: cte_names = set()
-
-        for stmt in stmts:
-            stmt_type = stmt.get("type", "").upper()
-
-            if stmt_type == "EXECUTE_PROCEDURE":
-                if proc_name := stmt.get("name"):
-                    # CHANGED: Add normalized name.
-                    lineage[proc]["calls"].add(normalize_name(proc_name))
-
-            elif stmt_type == "SET" and "value" in stmt:
-                process_expression_condition(proc, stmt["value"], table_usage, lineage)
-
-            elif stmt_type == "WITH_CTE":
-                local_cte_names = {cte.get("name") for cte in stmt.get("cte_list", [])}
-                for cte in stmt.get("cte_list", []):
-                    if "query" in cte and isinstance(query := cte.get("query"), dict):
-                        process_statements(proc, [query], table_usage, lineage, cte_names | local_cte_names)
-                if "main_query" in stmt and isinstance(main_query := stmt.get("main_query"), dict):
-                    process_statements(proc, [main_query], table_usage, lineage, cte_names | local_cte_names)
-
-            elif stmt_type == "DECLARE_CURSOR":
-                if "select_statement" in stmt and isinstance(cursor_query := stmt.get("select_statement"), dict):
-                    process_statements(proc, [cursor_query], table_usage, lineage, cte_names)
-            
-            elif stmt_type in ("SELECT", "SELECT_INTO"):
-                query_obj = stmt if stmt_type == "SELECT" else stmt.get("query", {})
-                
-                if isinstance(query_obj, dict):
-                    from_clause = query_obj.get("from")
-                    tables = [from_clause] if isinstance(from_clause, str) else []
-                    
-                    strings_to_analyze = []
-                    strings_to_analyze.extend(query_obj.get("columns", []))
-                    strings_to_analyze.extend(get_strings_from_node(query_obj.get("where", {})))
-                    full_query_str = " ".join(strings_to_analyze)
-
-                    aliases = {
-                        match.group(1)
-                        for col_expr in query_obj.get("columns", [])
-                        if (match := re.search(r'\bAS\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', col_expr, re.IGNORECASE))
-                    }
-                    
-                    objects_to_exclude = set(tables) | cte_names | aliases
-                    columns = extract_referenced_columns(full_query_str, objects_to_exclude)
-                    
-                    for table_name in tables:
-                        if table_name and table_name not in ["DUMMY_TABLE", "NO_TABLE"] and table_name not in cte_names:
-                            # CHANGED: Use normalized table names for keys.
-                            norm_table = normalize_name(table_name)
-                            lineage[norm_table]["type"] = "table"
-                            table_usage[norm_table][proc].append({"op": "read", "cols": columns})
-            
-            # --- MODIFIED BLOCK FOR UPDATE ---
-            elif stmt_type == "UPDATE":
-                if table_name := stmt.get("table"):
-                    # CHANGED: Use normalized table names.
-                    norm_table = normalize_name(table_name)
-                    lineage[norm_table]["type"] = "table"
-
-                    # Get columns being written to (in the SET clause)
-                    set_cols = list(stmt.get("set", {}).keys())
-                    if set_cols:
-                        table_usage[norm_table][proc].append({"op": "write", "cols": sorted(set_cols)})
-
-                    # Get columns being read from (in WHERE and SET values)
-                    where_strings = get_strings_from_node(stmt.get("where", {}))
-                    set_value_strings = get_strings_from_node(list(stmt.get("set", {}).values()))
-                    read_strings = " ".join(where_strings + set_value_strings)
-                    
-                    # Exclude the table itself and written columns to find read columns
-                    read_cols = extract_referenced_columns(read_strings, {norm_table} | set(set_cols))
-                    
-                    if read_cols and read_cols != ['*']:
-                        table_usage[norm_table][proc].append({"op": "read", "cols": read_cols})
-            # --- END MODIFIED BLOCK FOR UPDATE ---
-
-            elif stmt_type == "INSERT":
-                if table_name := stmt.get("table"):
-                    # CHANGED: Use normalized table names.
-                    norm_table = normalize_name(table_name)
-                    columns = stmt.get("columns", ["*"])
-                    lineage[norm_table]["type"] = "table"
-                    table_usage[norm_table][proc].append({"op": "write", "cols": columns})
-                if "select_statement" in stmt:
-                    process_statements(proc, [stmt["select_statement"]], table_usage, lineage, cte_names)
-
-            elif stmt_type == "DELETE":
-                if table_name := stmt.get("table"):
-                    # CHANGED: Use normalized table names.
-                    norm_table = normalize_name(table_name)
-                    where_strings = get_strings_from_node(stmt.get("where", {}))
-                    columns = extract_referenced_columns(" ".join(where_strings), {norm_table})
-                    lineage[norm_table]["type"] = "table"
-                    table_usage[norm_table][proc].append({"op": "write", "cols": columns})
-
-            if "condition" in stmt:
-                process_expression_condition(proc, stmt["condition"], table_usage, lineage)
-            for key in ["then", "else", "body"]:
-                if key in stmt and isinstance(stmt.get(key), list):
-                    process_statements(proc, stmt[key], table_usage, lineage, cte_names)
-    
+
+def _analyze_batch(batch: list) -> list:
+    """Process-pool worker: analyzes a batch of (name, ast) pairs."""
+    return [analyze_object(name, ast) for name, ast in batch]
+
+
+def _iter_batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_contributions(ast_objects, previous_state: dict, incremental: bool = False, workers: int = 1, batch_size: int = 32):
+    """
+    Yields (name, fingerprint, contribution, reused) for every (name, ast) pair, in input order.
+
+    Unchanged objects (incremental mode) are taken from previous_state. The
+    rest are analyzed in-process, or, with workers > 1, in batches on a
+    process pool. At most 2 * workers batches are in flight, so a streamed
+    AST is never materialised whole, and results are yielded in the original
+    order so merging them gives exactly the serial result.
+    """
+    def resolve(batch):
+        entries, todo = [], []
+        for name, ast in batch:
+            fingerprint = fingerprint_ast_object(ast) if incremental else None
+            previous = previous_state.get(name)
+            if previous and previous.get("fingerprint") == fingerprint:
+                entries.append((name, fingerprint, previous["contribution"]))
+            else:
+                entries.append((name, fingerprint, None))
+                todo.append((name, ast))
+        return entries, todo
+
+    def drain(entries, results):
+        results = iter(results)
+        for name, fingerprint, contribution in entries:
+            if contribution is None:
+                yield name, fingerprint, next(results), False
+            else:
+                yield name, fingerprint, contribution, True
+
+    if workers <= 1:
+        for batch in _iter_batches(ast_objects, batch_size):
+            entries, todo = resolve(batch)
+            yield from drain(entries, _analyze_batch(todo))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for batch in _iter_batches(ast_objects, batch_size):
+            entries, todo = resolve(batch)
+            in_flight.append((entries, executor.submit(_analyze_batch, todo) if todo else None))
+            if len(in_flight) >= 2 * workers:
+                entries, future = in_flight.popleft()
+                yield from drain(entries, future.result() if future else [])
+        while in_flight:
+            entries, future = in_flight.popleft()
+            yield from drain(entries, future.result() if future else [])
+
+
+def analyze_lineage(index_file: str, ast_file: str, output_file: str, incremental: bool = False, state_file: str = None,
+                    streaming: bool = False, workers: int = 1):
+    """
+    Builds the lineage JSON for every procedure, function and trigger in the AST.
+
+    With incremental=True each AST entry is fingerprinted and its lineage
+    contribution (calls, tables and column usage) is persisted in state_file
+    (see default_state_path). On the next run only new or changed objects are
+    walked again; the rest are reused and all contributions are re-merged.
+
+    With streaming=True the AST file is read one object at a time (see
+    src.ast_stream) instead of being loaded whole, so memory stays bounded by
+    the largest single object.
+
+    With workers > 1 the objects are analyzed on a process pool of that size
+    (see iter_contributions); the written lineage is identical to a serial run.
+    """
     # --- Main Execution ---
     try:
         with open(index_file, 'r') as f: index_data = json.load(f)
-        with open(ast_file, 'r') as f: ast_data = json.load(f)
+        if not streaming:
+            with open(ast_file, 'r') as f: ast_data = json.load(f)
     except Exception as e:
         print(f"{Colours.RED}Error opening or parsing input files: {e}{Colours.RESET}")
         return
@@ -209,10 +305,48 @@ def analyze_lineage(index_file: str, ast_file: str, output_file: str):
                 all_db_objects[normalize_name(name)] = {"type": obj_type[:-1]}
     
     # CHANGED: Normalize object names from the AST.
-    ast_map = {normalize_name(item.get(key)): item for type, key in key_map.items() for item in ast_data.get(type, []) if item.get(key)}
+    if streaming:
+        ast_objects = (
+            (normalize_name(item.get(key_map[section])), item)
+            for section, item in iter_ast_objects(ast_file, key_map)
+            if item.get(key_map[section])
+        )
+    else:
+        ast_map = {normalize_name(item.get(key)): item for type, key in key_map.items() for item in ast_data.get(type, []) if item.get(key)}
+        ast_objects = ast_map.items()
+
+    if incremental:
+        state_file = state_file or default_state_path(output_file)
+        previous_state = load_lineage_state(state_file)
+    else:
+        previous_state = {}
+
+    current_state = {}
+    reused = 0
+    try:
+        for name, fingerprint, contribution, was_reused in iter_contributions(ast_objects, previous_state, incremental, workers):
+            current_state[name] = {"fingerprint": fingerprint, "contribution": contribution}
+            reused += was_reused
+    except (OSError, ValueError) as e:
+        # Only reachable when streaming, where the AST file is read lazily
+        print(f"{Colours.RED}Error opening or parsing input files: {e}{Colours.RESET}")
+        return
 
-    for name, ast in ast_map.items():
-        process_statements(name, ast.get("statements", []), table_usage, lineage)
+    # Merge the per-object contributions back into the shared lineage maps
+    for name, entry in current_state.items():
+        contribution = entry["contribution"]
+        if contribution["calls"]:
+            lineage[name]["calls"].update(contribution["calls"])
+        for table in contribution["tables"]:
+            lineage[table]["type"] = "table"
+        for table, ops in contribution["usage"].items():
+            table_usage[table][name].extend(ops)
+
+    if incremental:
+        removed = len(set(previous_state) - set(current_state))
+        print(f"{Colours.YELLOW}Incremental analysis: {len(current_state) - reused} object(s) analyzed, "
+              f"{reused} reused, {removed} removed.{Colours.RESET}")
+        save_lineage_state(state_file, current_state)
 
     for name in list(lineage.keys()):
         if lineage[name].get("type") == "table" and name not in all_db_objects:
@@ -226,6 +360,8 @@ def analyze_lineage(index_file: str, ast_file: str, output_file: str):
                 called_by_map[called][obj_data["type"]].add(name)
     
     formatted_lineage = {}
+    # Deduplicates column accesses per table in O(1) instead of scanning a list
+    column_index = ColumnUsageIndex()
     for name in sorted(all_db_objects.keys()):
         meta = all_db_objects.get(name, {})
         obj_type = meta.get("type")
@@ -237,7 +373,6 @@ def analyze_lineage(index_file: str, ast_file: str, output_file: str):
             direct_callers = {c for c in table_usage.get(name, {})}
             entry["called_by"] = sorted(list(direct_callers))
 
-            columns_list = []
             if name in table_usage:
                 for caller, ops in table_usage[name].items():
                     caller_type = all_db_objects.get(caller, {}).get("type")
@@ -246,9 +381,8 @@ def analyze_lineage(index_file: str, ast_file: str, output_file: str):
                         unique_cols = sorted(list(set(op_info.get('cols', []))))
                         for col in unique_cols:
                             if col == "*": continue
-                            col_entry = {"name": col.strip(), "usage": op_info.get("op"), "caller": caller, "caller_type": caller_type}
-                            if col_entry not in columns_list: columns_list.append(col_entry)
-            entry["columns"] = sorted(columns_list, key=lambda x: (x['name'], x['caller']))
+                            column_index.add(name, col.strip(), op_info.get("op"), caller, caller_type)
+            entry["columns"] = sorted(column_index.columns_for(name), key=lambda x: (x['name'], x['caller']))
 
         elif obj_type in ["procedure", "function"]:
             # CHANGED: Do not strip schemas from called objects.
@@ -272,25 +406,19 @@ def analyze_lineage(index_file: str, ast_file: str, output_file: str):
     # --- Validation and File Write ---
     print(f"\n{Colours.YELLOW}--- Validating and Writing Lineage ---{Colours.RESET}")
     try:
-        script_path = os.path.abspath(__file__)
-        src_dir = os.path.dirname(script_path)
-        # Assumes schemas directory is a sibling of the 'src' directory
-        schema_dir = os.path.join(os.path.dirname(src_dir), "schemas")
-        lineage_schema_path = os.path.join(schema_dir, "lineage_Schema.json")
-
-        with open(lineage_schema_path, "r") as f:
-            lineage_schema = json.load(f)
-        
         print("Validating generated lineage data against its schema...")
-        jsonschema.validate(instance=formatted_lineage, schema=lineage_schema)
-        print(f"{Colours.GREEN}Generated lineage schema validation successful.{Colours.RESET}")
+        start = time.perf_counter()
+        # The compiled lineage validator is shared by every run in this process
+        validate_instance(formatted_lineage, "lineage")
+        print(f"{Colours.GREEN}Generated lineage schema validation successful "
+              f"({time.perf_counter() - start:.3f}s).{Colours.RESET}")
 
         with open(output_file, "w") as f:
             json.dump(formatted_lineage, f, indent=2, sort_keys=True)
         print(f"\n{Colours.GREEN}✅ Lineage written to {output_file}{Colours.RESET}")
 
     except FileNotFoundError:
-        print(f"{Colours.RED}Error: Could not find lineage_Schema.json in the expected path: '{schema_dir}'{Colours.RESET}")
+        print(f"{Colours.RED}Error: Could not find lineage_Schema.json in the expected path: '{SCHEMA_DIR}'{Colours.RESET}")
     except jsonschema.exceptions.ValidationError as e:
         print(f"{Colours.RED}Generated lineage schema validation FAILED!{Colours.RESET}")
         print(f"{Colours.RED}Error: {e.message} in object: '{'.'.join(map(str, e.path))}'{Colours.RESET}")
@@ -0,0 +1,108 @@
+import json
+
+# Top-level AST arrays and the key holding each object's name.
+AST_SECTIONS = {"procedures": "proc_name", "functions": "func_name", "triggers": "trigger_name"}
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStreamReader:
+    """
+    Minimal incremental reader over a JSON file.
+
+    Only the current, not yet consumed window of the file is kept in memory.
+    Values are decoded one at a time with json.JSONDecoder.raw_decode; when a
+    value is cut off by the end of the window more of the file is read and the
+    decode is retried, so the window never grows beyond the largest value.
+    """
+
+    def __init__(self, f, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self, size: int = None) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the consumed prefix before growing the window
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character without consuming it ('' at EOF)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'EOF'}' while streaming JSON")
+        self._pos += 1
+
+    def decode_value(self):
+        """Decodes and consumes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Most likely truncated by the window: read as much again and retry
+                if not self._read_more(max(self._chunk_size, len(self._buf) - self._pos)):
+                    raise
+                continue
+            # A number or literal that ends exactly at the window edge may continue in the next chunk
+            if end == len(self._buf) and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_ast_objects(ast_path: str, sections=AST_SECTIONS, chunk_size: int = 1 << 20):
+    """
+    Streams the AST file and yields (section, object) pairs, one object at a time.
+
+    Only the arrays named in sections are streamed element by element; any
+    other top-level value is decoded and discarded. Peak memory is therefore
+    bounded by the largest single procedure/function/trigger, not the file.
+    """
+    with open(ast_path, "r", encoding="utf-8") as f:
+        reader = _JsonStreamReader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.decode_value()
+            reader.expect(":")
+            if key in sections and reader.peek() == "[":
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    while True:
+                        yield key, reader.decode_value()
+                        if reader.peek() == ",":
+                            reader.expect(",")
+                            continue
+                        reader.expect("]")
+                        break
+            else:
+                reader.decode_value()
+
+            if reader.peek() == ",":
+                reader.expect(",")
+                continue
+            reader.expect("}")
+            break
@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+
+class ColumnUsageIndex:
+    """
+    Deduplicated store of column accesses keyed by (table, column, usage, caller).
+
+    Adding an access is O(1) regardless of how many procedures touch a table,
+    and entries keep their first-insertion order per table, so the "columns"
+    lists written to lineage.json are the same as before. Secondary indexes
+    answer per-column and per-caller questions ("who writes Orders.Status?")
+    without rescanning the lineage.
+    """
+
+    def __init__(self):
+        self._by_table = defaultdict(dict)
+        self._by_column = defaultdict(list)
+        self._by_caller = defaultdict(list)
+
+    def add(self, table: str, column: str, usage: str, caller: str, caller_type: str) -> bool:
+        """Records one access; returns False if the same access was already recorded."""
+        key = (column, usage, caller)
+        table_entries = self._by_table[table]
+        if key in table_entries:
+            return False
+        entry = {"name": column, "usage": usage, "caller": caller, "caller_type": caller_type}
+        table_entries[key] = entry
+        self._by_column[(table, column)].append(entry)
+        self._by_caller[caller].append((table, entry))
+        return True
+
+    @classmethod
+    def from_lineage(cls, lineage: dict) -> "ColumnUsageIndex":
+        """Builds an index from a lineage JSON document (the output of analyze_lineage)."""
+        index = cls()
+        for table, meta in lineage.items():
+            if meta.get("type") != "table":
+                continue
+            for col in meta.get("columns", []):
+                index.add(table, col["name"], col["usage"], col["caller"], col.get("caller_type"))
+        return index
+
+    def tables(self) -> list:
+        return list(self._by_table)
+
+    def columns_for(self, table: str) -> list:
+        """All recorded accesses of a table's columns, in insertion order."""
+        return list(self._by_table.get(table, {}).values())
+
+    def usages_of(self, table: str, column: str, usage: str = None) -> list:
+        """Accesses of one column, optionally restricted to 'read' or 'write'."""
+        entries = self._by_column.get((table, column), [])
+        return [e for e in entries if usage is None or e["usage"] == usage]
+
+    def writers_of(self, table: str, column: str) -> list:
+        """Names of the objects that write the column."""
+        return sorted({e["caller"] for e in self.usages_of(table, column, "write")})
+
+    def readers_of(self, table: str, column: str) -> list:
+        """Names of the objects that read the column."""
+        return sorted({e["caller"] for e in self.usages_of(table, column, "read")})
+
+    def accessed_by(self, caller: str) -> list:
+        """(table, entry) pairs for every column access made by one object."""
+        return list(self._by_caller.get(caller, []))
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._by_table.values())
@@ -1,6 +1,12 @@
 import json
 import os
 import re
+try:
+    # Relative, so it works whether src is imported as src or as Tool4.src (dashboard)
+    from .lineage_graph import LineageGraph
+except ImportError:
+    # Run as a script (python Tool4/src/generate_mermaid.py), with src/ itself on sys.path
+    from lineage_graph import LineageGraph
 
 def sanitize_for_mermaid(node_name):
     """Sanitizes a string to be a valid Mermaid.js node ID."""
@@ -9,105 +15,182 @@ def sanitize_for_mermaid(node_name):
     # Replace any sequence of invalid characters with a single underscore
     return re.sub(r'[^a-zA-Z0-9_]+', '_', node_name)
 
-def generate_lineage_diagram(lineage_path, output_path):
-    """
-    Generates a Mermaid diagram from a database lineage JSON file.
-    """
+STYLE_LINES = [
+    "    %% --- Styles --- %%",
+    "    classDef table fill:#f96,stroke:#333,stroke-width:2px,color:#000;",
+    "    classDef function fill:#9f6,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;",
+    "    classDef trigger fill:#fa0,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;",
+    "    classDef procedure fill:#9cf,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;",
+    "    classDef column fill:#fff,stroke:#333,stroke-width:1px,color:#000,font-size:12px;\n",
+]
+# Per-shard caps for sharded output; Mermaid refuses diagrams over 500 edges by default (maxEdges)
+DEFAULT_MAX_NODES = 300
+DEFAULT_MAX_EDGES = 500
+# Mermaid's default maxTextSize; larger scripts are not rendered
+MERMAID_MAX_TEXT_SIZE = 50000
+# Room left in each shard for the style and hierarchy lines
+_HEADER_CHARS = 2000
+# Nodes drawn in a shard but defined in another one
+EXTERNAL_STYLE = "    classDef external fill:#eee,stroke:#999,stroke-dasharray:3 3,color:#555;"
+# The object or column a neighbourhood diagram is centred on
+FOCUS_STYLE = "    classDef focus stroke:#e11,stroke-width:4px;"
+# Objects drawn around a focus at most, so hub tables cannot blow up the diagram
+DEFAULT_NEIGHBOURHOOD_OBJECTS = 150
+
+
+def _load_lineage(lineage_path):
     try:
         with open(lineage_path, "r", encoding="utf-8") as f:
-            lineage = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         print(f"❌ Error: The file '{lineage_path}' was not found.")
-        return
     except json.JSONDecodeError:
         print(f"❌ Error: Could not decode JSON from '{lineage_path}'. Check for syntax errors.")
-        return
+    return None
+
+
+def node_definition(name, meta):
+    """
+    Returns (definition, node count) for one lineage object, or (None, 0) for other types.
 
+    A table is a subgraph with one node per distinct column; a procedure,
+    function or trigger is a single node.
+    """
+    node_type = meta.get("type")
+    sanitized_name = sanitize_for_mermaid(name)
+
+    if node_type == "table":
+        # Use a unique subgraph ID so Mermaid doesn’t confuse it with node IDs
+        subgraph_id = f"sg_{sanitized_name}"
+        table_lines = [f'\n    subgraph {subgraph_id}["{name}"]']
+
+        # Get unique column names from the 'columns' list
+        column_names = sorted(list(set(c.get("name") for c in meta.get("columns", []) if c.get("name"))))
+        if column_names:
+            for col_name in column_names:
+                sanitized_col_id = sanitize_for_mermaid(f"{name}_{col_name}")
+                table_lines.append(f'        {sanitized_col_id}["{col_name}"];')
+                table_lines.append(f"        class {sanitized_col_id} column;")
+        else:
+             table_lines.append(f'        {sanitized_name}_placeholder["(no columns)"];')
+
+        table_lines.append("    end")
+        # Style the subgraph container, not the original sanitized name
+        table_lines.append(f"    class {subgraph_id} table;")
+        return "\n".join(table_lines), 1 + max(1, len(column_names))
+
+    if node_type in ["procedure", "function", "trigger"]:
+        return f'    {sanitized_name}("{name}");\n    class {sanitized_name} {node_type};', 1
+    return None, 0
+
+
+def object_edges(name, meta) -> dict:
+    """
+    Returns the diagram edges declared by one lineage object.
+
+    Maps each edge line to (source id, source label, target id, target label),
+    so a shard can add placeholder nodes for endpoints it does not define.
+    """
+    edges = {}
+    sanitized_caller = sanitize_for_mermaid(name)
+    node_type = meta.get("type")
+
+    # Object-to-Object calls
+    if node_type in ["procedure", "function", "trigger"]:
+        for callee_name in meta.get("calls", []):
+            sanitized_callee = sanitize_for_mermaid(callee_name)
+            edges[f'    {sanitized_caller} -->|calls| {sanitized_callee};'] = (
+                sanitized_caller, name, sanitized_callee, callee_name)
+
+    # Trigger-to-Table attachment
+    if node_type == "trigger":
+        table_name = meta.get("on_table")
+        event = meta.get("event", "on event")
+        if table_name:
+            sanitized_table = sanitize_for_mermaid(table_name)
+            edges[f'    {sanitized_table} -.->|{event}| {sanitized_caller};'] = (
+                sanitized_table, table_name, sanitized_caller, name)
+
+    # Object-to-Column access (defined in the table's schema)
+    if node_type == "table":
+        table_name = name
+        for col_info in meta.get("columns", []):
+            col_name = col_info.get("name")
+            usage = col_info.get("usage")
+            accessing_caller = col_info.get("caller")
+            if all([col_name, usage, accessing_caller]):
+                sanitized_accessing_caller = sanitize_for_mermaid(accessing_caller)
+                sanitized_col_id = sanitize_for_mermaid(f"{table_name}_{col_name}")
+                edges[f'    {sanitized_accessing_caller} -- "{usage}" --> {sanitized_col_id};'] = (
+                    sanitized_accessing_caller, accessing_caller, sanitized_col_id, f"{table_name}.{col_name}")
+    return edges
+
+
+def _defined_ids(name, meta):
+    """Node IDs that the definition of a lineage object makes available to edges."""
+    sanitized_name = sanitize_for_mermaid(name)
+    if meta.get("type") != "table":
+        return {sanitized_name}
+    # The trigger edge targets the bare table ID, as in the full diagram
+    ids = {sanitized_name, f"sg_{sanitized_name}", f"{sanitized_name}_placeholder"}
+    ids.update(sanitize_for_mermaid(f"{name}_{c.get('name')}") for c in meta.get("columns", []) if c.get("name"))
+    return ids
+
+
+def build_diagram(lineage: dict, names=None, title=None, external=True, focus=()):
+    """
+    Builds the Mermaid script for a lineage document, or for the objects in names only.
+
+    With a subset, edges leaving it point to dashed 'external' placeholder
+    nodes instead of objects defined elsewhere, or are left out when
+    external is False (names that are referenced but not defined in the
+    lineage are still drawn as placeholders). Without a subset the output is
+    the complete diagram written by generate_lineage_diagram. Node IDs in
+    focus are highlighted. Returns the script and its render size (nodes,
+    edges, external nodes, characters).
+    """
     lines = ["graph TD\n"]
-    
+    if title:
+        lines.append(f"    %% {title} %%")
+
     # Define styles for different node types
-    lines.append("    %% --- Styles --- %%")
-    lines.append("    classDef table fill:#f96,stroke:#333,stroke-width:2px,color:#000;")
-    lines.append("    classDef function fill:#9f6,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;")
-    lines.append("    classDef trigger fill:#fa0,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;")
-    lines.append("    classDef procedure fill:#9cf,stroke:#333,stroke-width:2px,color:#000,font-weight:bold;")
-    lines.append("    classDef column fill:#fff,stroke:#333,stroke-width:1px,color:#000,font-size:12px;\n")
+    lines.extend(STYLE_LINES)
+    if names is not None:
+        lines.append(EXTERNAL_STYLE)
+        if focus:
+            lines.append(FOCUS_STYLE)
+        lines[-1] += "\n"
+        selected = [n for n in dict.fromkeys(names) if n in lineage]
+        names = set(names)
+    else:
+        selected = list(lineage)
 
     node_definitions = {}
-    edges = set()
-    
+    node_count = 0
+    edges = {}
+
     # Lists to hold node names for visual ranking
     function_nodes, trigger_nodes, procedure_nodes = [], [], []
 
     # 1. First Pass: Define all nodes and subgraphs
-    for name, meta in lineage.items():
+    for name in selected:
+        meta = lineage[name]
+        definition, count = node_definition(name, meta)
+        if definition is None:
+            continue
+        node_definitions[name] = definition
+        node_count += count
         node_type = meta.get("type")
-        sanitized_name = sanitize_for_mermaid(name)
-        
-        if node_type == "table":
-            # Use a unique subgraph ID so Mermaid doesn’t confuse it with node IDs
-            subgraph_id = f"sg_{sanitized_name}"
-            table_lines = [f'\n    subgraph {subgraph_id}["{name}"]']
-            
-            # Get unique column names from the 'columns' list
-            column_names = sorted(list(set(c.get("name") for c in meta.get("columns", []) if c.get("name"))))
-            if column_names:
-                for col_name in column_names:
-                    sanitized_col_id = sanitize_for_mermaid(f"{name}_{col_name}")
-                    table_lines.append(f'        {sanitized_col_id}["{col_name}"];')
-                    table_lines.append(f"        class {sanitized_col_id} column;")
-            else:
-                 table_lines.append(f'        {sanitized_name}_placeholder["(no columns)"];')
-            
-            table_lines.append("    end")
-            # Style the subgraph container, not the original sanitized name
-            table_lines.append(f"    class {subgraph_id} table;")
-            
-            node_definitions[name] = "\n".join(table_lines)
-        
-        elif node_type in ["procedure", "function", "trigger"]:
-            node_definitions[name] = f'    {sanitized_name}("{name}");'
-            if node_type == "function":
-                function_nodes.append(sanitized_name)
-                node_definitions[name] += f"\n    class {sanitized_name} function;"
-            elif node_type == "trigger":
-                trigger_nodes.append(sanitized_name)
-                node_definitions[name] += f"\n    class {sanitized_name} trigger;"
-            else: # procedure
-                procedure_nodes.append(sanitized_name)
-                node_definitions[name] += f"\n    class {sanitized_name} procedure;"
+        if node_type == "function":
+            function_nodes.append(sanitize_for_mermaid(name))
+        elif node_type == "trigger":
+            trigger_nodes.append(sanitize_for_mermaid(name))
+        elif node_type == "procedure":
+            procedure_nodes.append(sanitize_for_mermaid(name))
 
     # 2. Second Pass: Define all relationships (edges)
-    for name, meta in lineage.items():
-        caller_name = name
-        sanitized_caller = sanitize_for_mermaid(caller_name)
-        node_type = meta.get("type")
-
-        # Object-to-Object calls
-        if node_type in ["procedure", "function", "trigger"]:
-            for callee_name in meta.get("calls", []):
-                sanitized_callee = sanitize_for_mermaid(callee_name)
-                edges.add(f'    {sanitized_caller} -->|calls| {sanitized_callee};')
-
-        # Trigger-to-Table attachment
-        if node_type == "trigger":
-            table_name = meta.get("on_table")
-            event = meta.get("event", "on event")
-            if table_name:
-                sanitized_table = sanitize_for_mermaid(table_name)
-                edges.add(f'    {sanitized_table} -.->|{event}| {sanitized_caller};')
-
-        # Object-to-Column access (defined in the table's schema)
-        if node_type == "table":
-            table_name = name
-            for col_info in meta.get("columns", []):
-                col_name = col_info.get("name")
-                usage = col_info.get("usage")
-                accessing_caller = col_info.get("caller")
-                if all([col_name, usage, accessing_caller]):
-                    sanitized_accessing_caller = sanitize_for_mermaid(accessing_caller)
-                    sanitized_col_id = sanitize_for_mermaid(f"{table_name}_{col_name}")
-                    edges.add(f'    {sanitized_accessing_caller} -- "{usage}" --> {sanitized_col_id};')
+    for name in selected:
+        edges.update(object_edges(name, lineage[name]))
 
     # 3. Assemble the final Mermaid script
     lines.append("\n    %% --- Visual Hierarchy --- %%")
@@ -131,20 +214,217 @@ def generate_lineage_diagram(lineage_path, output_path):
 
     lines.append("\n    %% --- Node Definitions --- %%")
     lines.extend(sorted(node_definitions.values()))
-    
+
+    placeholders = {}
+    if names is not None:
+        defined = set()
+        for name in selected:
+            defined |= _defined_ids(name, lineage[name])
+        for line, (source_id, source_label, target_id, target_label) in list(edges.items()):
+            outside = [(node_id, label) for node_id, label in ((source_id, source_label), (target_id, target_label))
+                       if node_id not in defined]
+            if not external and any(label not in names for _, label in outside):
+                del edges[line]
+                continue
+            for node_id, label in outside:
+                placeholders.setdefault(node_id, label)
+        if placeholders:
+            lines.append("\n    %% --- External Nodes --- %%")
+            lines.extend(f'    {node_id}["{label}"]:::external;' for node_id, label in sorted(placeholders.items()))
+        for node_id in focus:
+            lines.append(f"    class {node_id} focus;")
+
     lines.append("\n    %% --- Relationships --- %%")
-    lines.extend(sorted(list(edges)))
+    lines.extend(sorted(edges))
+    text = "\n".join(lines)
+    return text, {"nodes": node_count + len(placeholders), "edges": len(edges),
+                  "external_nodes": len(placeholders), "chars": len(text)}
 
-    # Write the output file
+
+def render_lineage_diagram(lineage: dict, names=None, title=None) -> str:
+    """The Mermaid script of build_diagram without the size statistics."""
+    return build_diagram(lineage, names, title)[0]
+
+
+def render_neighbourhood(graph, focus, hops=1, direction="both", max_objects=DEFAULT_NEIGHBOURHOOD_OBJECTS):
+    """
+    Mermaid diagram of the objects within `hops` steps of an object or column.
+
+    graph is a prebuilt lineage_graph.LineageGraph, so each call only walks
+    the neighbourhood instead of the whole lineage. focus is an object name
+    or a (table, column) pair, which is highlighted. Only edges between the
+    drawn objects are kept. Returns the script and its render size, plus the
+    number of objects and whether max_objects cut the neighbourhood short.
+    """
+    hood = graph.neighbourhood(focus, hops=hops, direction=direction, max_objects=max_objects)
+    if isinstance(focus, tuple):
+        focus_ids = [sanitize_for_mermaid(f"{focus[0]}_{focus[1]}")]
+        label = f"{focus[0]}.{focus[1]}"
+    else:
+        meta = graph.lineage.get(focus, {})
+        focus_ids = [f"sg_{sanitize_for_mermaid(focus)}" if meta.get("type") == "table" else sanitize_for_mermaid(focus)]
+        label = focus
+    ways = "upstream and downstream" if direction == "both" else direction
+    title = f"Neighbourhood of {label}: {ways}, {hops} hop(s)"
+    text, stats = build_diagram(graph.lineage, hood["objects"], title=title, external=False, focus=focus_ids)
+    stats.update(objects=len(hood["objects"]), truncated=hood["truncated"])
+    return text, stats
+
+
+def _write_text(output_path, text):
     output_dir = os.path.dirname(output_path)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
-    
+
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
-    
+        f.write(text)
+
+
+def generate_lineage_diagram(lineage_path, output_path):
+    """
+    Generates a Mermaid diagram from a database lineage JSON file.
+    """
+    lineage = _load_lineage(lineage_path)
+    if lineage is None:
+        return
+
+    # Write the output file
+    _write_text(output_path, render_lineage_diagram(lineage))
+
     print(f"✅ Mermaid diagram successfully generated at: {output_path}")
 
+
+def _schema_of(name):
+    schema, _, _ = name.rpartition(".")
+    return schema or "default"
+
+
+def plan_shards(lineage: dict, by="component", max_nodes=DEFAULT_MAX_NODES, max_edges=DEFAULT_MAX_EDGES,
+                max_chars=MERMAID_MAX_TEXT_SIZE) -> list:
+    """
+    Partitions the lineage objects into diagram shards within the node, edge and size caps.
+
+    by="component" keeps connected objects together and packs small
+    components into shared shards; by="schema" gives every schema its own
+    shards. A group over the caps is split in breadth-first order so
+    neighbours stay in the same shard. An object that exceeds the caps on
+    its own (a table with very many accessed columns) gets a shard of its
+    own. Returns dicts with id, objects and the planned nodes, edges and chars.
+    """
+    graph = LineageGraph(lineage)
+    # Connected objects end up next to each other in this order
+    ordered = [name for component in graph.components() for name in component if name in lineage]
+    if by == "schema":
+        groups = {}
+        for name in ordered:
+            groups.setdefault(_schema_of(name), []).append(name)
+        groups = sorted(groups.items())
+    elif by == "component":
+        groups = [(None, [n for n in component if n in lineage]) for component in graph.components()]
+    else:
+        raise ValueError(f"Unknown shard mode: {by}")
+
+    caps = (max_nodes, max_edges, max_chars - _HEADER_CHARS)
+    cost = {}
+    for name in ordered:
+        definition, nodes = node_definition(name, lineage[name])
+        edges = object_edges(name, lineage[name])
+        # External placeholders are not counted; they are few compared to the edges
+        cost[name] = (nodes, len(edges), len(definition or "") + sum(len(e) + 1 for e in edges) + 30 * nodes)
+    shards = []
+
+    def fits(shard, extra):
+        return all(used + more <= cap for used, more, cap in zip(shard["size"], extra, caps))
+
+    def add(shard, extra):
+        shard["size"] = tuple(used + more for used, more in zip(shard["size"], extra))
+
+    def new_shard(key):
+        same_key = sum(1 for shard in shards if shard["key"] == key)
+        shard_id = f"{key}_{same_key + 1}" if key is not None and same_key else key
+        shard = {"key": key, "id": shard_id or f"part_{len(shards) + 1:03d}", "objects": [], "size": (0, 0, 0)}
+        shards.append(shard)
+        return shard
+
+    current = None
+    for key, group in groups:
+        if not group:
+            continue
+        group_size = tuple(map(sum, zip(*(cost[n] for n in group))))
+        # Whole components are packed together; schemas always start a new shard
+        if current is None or key is not None or not fits(current, group_size):
+            current = new_shard(key)
+        for name in group:
+            if current["objects"] and not fits(current, cost[name]):
+                current = new_shard(key)
+            current["objects"].append(name)
+            add(current, cost[name])
+    for shard in shards:
+        shard["nodes"], shard["edges"], shard["chars"] = shard.pop("size")
+        del shard["key"]
+    return shards
+
+
+def format_shard_stats(index: dict) -> str:
+    """One-paragraph summary of a sharded diagram index."""
+    shards = index["shards"]
+    if not shards:
+        return "🧩 No lineage objects to draw."
+    lines = [f"🧩 {len(shards)} diagram shard(s) by {index['by']} "
+             f"(caps: {index['max_nodes']} nodes, {index['max_edges']} edges, {index['max_chars']:,} chars)"]
+    for key in ("nodes", "edges", "chars"):
+        values = [shard[key] for shard in shards]
+        lines.append(f"   {key:<6} max {max(values):>8,}   avg {sum(values) / len(values):>10,.1f}   total {sum(values):>10,}")
+    over_cap = [shard["id"] for shard in shards if shard["over_cap"]]
+    if over_cap:
+        lines.append(f"   ⚠️ {len(over_cap)} shard(s) exceed the caps (a very wide table, or placeholders for "
+                     f"objects in other shards): {', '.join(over_cap[:5])}")
+    return "\n".join(lines)
+
+
+def generate_sharded_diagrams(lineage_path, output_dir, by="component", max_nodes=DEFAULT_MAX_NODES,
+                              max_edges=DEFAULT_MAX_EDGES, max_chars=MERMAID_MAX_TEXT_SIZE):
+    """
+    Writes one Mermaid file per shard of a lineage JSON file, plus index.json.
+
+    index.json lists every shard with its file, objects and render size, so
+    a viewer can open the shard that holds a given object. Returns the index,
+    or None if the lineage cannot be read.
+    """
+    lineage = _load_lineage(lineage_path)
+    if lineage is None:
+        return None
+
+    # Shards listed by an earlier run (e.g. with other caps) would otherwise linger
+    index_path = os.path.join(output_dir, "index.json")
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        for entry in previous.get("shards", []):
+            stale = os.path.join(output_dir, entry["file"])
+            if os.path.exists(stale):
+                os.remove(stale)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    shards = plan_shards(lineage, by=by, max_nodes=max_nodes, max_edges=max_edges, max_chars=max_chars)
+    entries = []
+    for number, shard in enumerate(shards, start=1):
+        file_name = f"{sanitize_for_mermaid(shard['id'])}.mmd"
+        text, stats = build_diagram(lineage, shard["objects"], title=f"Shard {number} of {len(shards)}: {shard['id']}")
+        _write_text(os.path.join(output_dir, file_name), text)
+        over_cap = stats["nodes"] > max_nodes or stats["edges"] > max_edges or stats["chars"] > max_chars
+        entries.append({"id": shard["id"], "file": file_name, "objects": shard["objects"], **stats,
+                        "over_cap": over_cap})
+
+    index = {"source": os.path.basename(lineage_path), "by": by, "max_nodes": max_nodes, "max_edges": max_edges,
+             "max_chars": max_chars, "shards": entries}
+    _write_text(index_path, json.dumps(index, indent=2))
+    print(f"✅ {len(entries)} Mermaid diagram shard(s) generated in: {output_dir}")
+    print(format_shard_stats(index))
+    return index
+
+
 if __name__ == "__main__":
     # Define the input and output file paths
     project_root = os.path.dirname(os.path.abspath(__file__))
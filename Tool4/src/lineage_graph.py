@@ -0,0 +1,162 @@
+from collections import defaultdict, deque
+
+ROUTINE_TYPES = ("procedure", "function", "trigger")
+# Callers of a routine, per caller type
+ROUTINE_CALLER_KEYS = ("called_by_procedure", "called_by_function", "called_by_trigger")
+# Every key listing an object's callers; on a table, called_by lists the objects that access it
+CALLER_KEYS = ("called_by",) + ROUTINE_CALLER_KEYS
+
+
+class LineageGraph:
+    """
+    Adjacency lists over the objects of a lineage JSON document.
+
+    An edge joins two objects when one calls the other, when a trigger is
+    attached to a table, or when an object accesses a table (its called_by
+    list, or reads and writes of its columns). Objects referenced by the
+    lineage but not defined in it are included as nodes so every diagram
+    edge has both ends in the graph.
+
+    The same edges are also kept with a direction for upstream/downstream
+    questions: a caller flows into what it calls, a writer into the table it
+    writes, a table into its readers and into the triggers attached to it
+    (a called_by entry alone has no direction). Calls, table accessors,
+    triggers and column-level writers, readers and accesses per caller are
+    indexed separately. This is the one adjacency index over a lineage: the
+    mermaid renderer, the dashboard and the chat (rag/graph_index.py) all
+    build on it.
+    """
+
+    def __init__(self, lineage: dict):
+        self.lineage = lineage
+        self.adjacent = defaultdict(set)
+        self.downstream = defaultdict(set)
+        self.upstream = defaultdict(set)
+        self.calls = defaultdict(set)
+        self.called_by = defaultdict(set)
+        self.accessed_by = defaultdict(set)
+        self.triggers_on = defaultdict(set)
+        self.events = {}
+        self.column_writers = defaultdict(set)
+        self.column_readers = defaultdict(set)
+        self.column_access = defaultdict(list)
+        # Lineage objects first, in document order, then referenced-only names
+        self.nodes = dict.fromkeys(lineage)
+
+        for name, meta in lineage.items():
+            for callee in meta.get("calls", []):
+                self._call(name, callee)
+            for key in ROUTINE_CALLER_KEYS:
+                for caller in meta.get(key, []):
+                    self._call(caller, name)
+            if meta.get("on_table"):
+                self.triggers_on[meta["on_table"]].add(name)
+                self.events[name] = (meta["on_table"], meta.get("event", ""))
+                self._link(meta["on_table"], name)
+            if meta.get("type") == "table":
+                for accessor in meta.get("called_by", []):
+                    self.accessed_by[name].add(accessor)
+                    self._connect(accessor, name)
+                for col in meta.get("columns", []):
+                    caller = col.get("caller")
+                    if not caller:
+                        continue
+                    self.column_access[caller].append((name, col))
+                    if col.get("usage") == "read":
+                        self._link(name, caller)
+                        self.column_readers[(name, col.get("name"))].add(caller)
+                    else:
+                        self._link(caller, name)
+                        self.column_writers[(name, col.get("name"))].add(caller)
+
+    def _connect(self, a, b):
+        """Records an undirected edge between a and b."""
+        if a == b:
+            return False
+        self.nodes.setdefault(a)
+        self.nodes.setdefault(b)
+        self.adjacent[a].add(b)
+        self.adjacent[b].add(a)
+        return True
+
+    def _link(self, source, target):
+        """Records that data or control flows from source to target."""
+        if self._connect(source, target):
+            self.downstream[source].add(target)
+            self.upstream[target].add(source)
+
+    def _call(self, caller, callee):
+        self.calls[caller].add(callee)
+        self.called_by[callee].add(caller)
+        self._link(caller, callee)
+
+    def neighbors(self, name) -> set:
+        """Objects one hop away: callers, callees, tables accessed, accessors and triggers."""
+        return self.adjacent.get(name, set())
+
+    def bfs_order(self, start) -> list:
+        """Objects reachable from start, in breadth-first order (neighbours sorted for stable output)."""
+        order, seen, queue = [], {start}, deque([start])
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for neighbour in sorted(self.neighbors(name)):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return order
+
+    def components(self) -> list:
+        """Connected components, largest first; each one lists its objects in breadth-first order."""
+        seen, components = set(), []
+        for name in self.nodes:
+            if name in seen:
+                continue
+            component = self.bfs_order(name)
+            seen.update(component)
+            components.append(component)
+        components.sort(key=len, reverse=True)
+        return components
+
+    def neighbourhood(self, focus, hops=1, direction="both", max_objects=None) -> dict:
+        """
+        Objects within `hops` steps upstream and/or downstream of an object or a column.
+
+        focus is an object name or a (table, column) pair; for a column the
+        first hop goes to the routines that write it (upstream) or read it
+        (downstream) rather than to every accessor of the table. direction is
+        "upstream", "downstream" or "both". Expansion stops once max_objects
+        objects are collected. Returns {"focus", "objects", "distance",
+        "truncated"}, with objects ordered by distance, then name.
+        """
+        if direction not in ("upstream", "downstream", "both"):
+            raise ValueError(f"Unknown direction: {direction}")
+        if isinstance(focus, tuple):
+            origin = focus[0]
+            first = {"upstream": self.column_writers.get(focus, set()),
+                     "downstream": self.column_readers.get(focus, set())}
+        else:
+            origin = focus
+            first = {"upstream": self.upstream.get(focus, set()), "downstream": self.downstream.get(focus, set())}
+
+        distance = {origin: 0}
+        truncated = False
+        for way in (("upstream", "downstream") if direction == "both" else (direction,)):
+            edges = self.upstream if way == "upstream" else self.downstream
+            seen = {origin}
+            frontier = sorted(first[way] - seen)
+            for depth in range(1, hops + 1):
+                following = set()
+                for name in frontier:
+                    seen.add(name)
+                    if name not in distance:
+                        if max_objects and len(distance) >= max_objects:
+                            truncated = True
+                            continue
+                        distance[name] = depth
+                    following |= edges.get(name, set())
+                frontier = sorted(following - seen)
+                if not frontier:
+                    break
+        objects = sorted(distance, key=lambda name: (distance[name], name))
+        return {"focus": focus, "objects": objects, "distance": distance, "truncated": truncated}
@@ -0,0 +1,100 @@
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+# Relative, so it works whether src is imported as src or as Tool4.src (dashboard)
+from .lineage_graph import CALLER_KEYS
+
+# Recent (query, type) searches whose matches are kept for paging
+_MATCH_CACHE_SIZE = 32
+
+
+class LineageNameIndex:
+    """
+    Name and type index over a lineage JSON document for browsing it a page at a time.
+
+    Names are sorted case-insensitively and stored lower-cased, one per line,
+    in a text blob per object type (plus one for all types), so a substring
+    search is a run of str.find calls over the blob instead of a Python loop
+    over every object. Matches of recent searches are kept, so turning pages
+    does not search again; only the requested page is turned into rows.
+    An instance can be shared between threads (e.g. Streamlit sessions).
+    """
+
+    def __init__(self, lineage: dict):
+        self.lineage = lineage
+        names = sorted(lineage, key=lambda name: (name.lower(), name))
+        self.type_counts = Counter(lineage[name].get("type", "unknown") for name in names)
+        self._names = {None: names}
+        for obj_type in self.type_counts:
+            self._names[obj_type] = [name for name in names if lineage[name].get("type", "unknown") == obj_type]
+        self._blobs = {}
+        self._starts = {}
+        for obj_type, group in self._names.items():
+            lowered = [name.lower() for name in group]
+            starts, pos = [], 0
+            for name in lowered:
+                starts.append(pos)
+                pos += len(name) + 1
+            self._blobs[obj_type] = "\n".join(lowered)
+            self._starts[obj_type] = starts
+        self._matches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.lineage)
+
+    def _find(self, query, obj_type) -> list:
+        """Positions (in the type's sorted name list) of the names containing query."""
+        key = (query, obj_type)
+        with self._lock:
+            cached = self._matches.get(key)
+            if cached is not None:
+                self._matches.move_to_end(key)
+                return cached
+        blob, starts = self._blobs.get(obj_type, ""), self._starts.get(obj_type, [])
+        matches = []
+        pos = blob.find(query)
+        while pos >= 0:
+            i = bisect_right(starts, pos) - 1
+            matches.append(i)
+            if i + 1 == len(starts):
+                break
+            # One hit per name: continue from the next name
+            pos = blob.find(query, starts[i + 1])
+        # Lists are never changed once stored, so callers may keep using an evicted one
+        with self._lock:
+            self._matches[key] = matches
+            self._matches.move_to_end(key)
+            while len(self._matches) > _MATCH_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        return matches
+
+    def search(self, query: str = "", obj_type: str = None, offset: int = 0, limit: int = 25) -> dict:
+        """
+        One page of the objects whose name contains query (case-insensitive).
+
+        obj_type restricts the results to one "type" value (None for all).
+        Returns {"total", "names"}, names being at most limit entries starting
+        at offset, in case-insensitive name order.
+        """
+        group = self._names.get(obj_type, [])
+        query = query.strip().lower()
+        if not query:
+            return {"total": len(group), "names": group[offset:offset + limit]}
+        if "\n" in query:
+            return {"total": 0, "names": []}
+        matches = self._find(query, obj_type)
+        return {"total": len(matches), "names": [group[i] for i in matches[offset:offset + limit]]}
+
+    def row(self, name: str) -> dict:
+        """Name, type and counts of columns, callers and calls of one object (a table row in the explorer)."""
+        meta = self.lineage.get(name, {})
+        return {"name": name, "type": meta.get("type", "unknown"), "columns": len(meta.get("columns", [])),
+                "callers": len(self.callers(name)), "calls": len(meta.get("calls", []))}
+
+    def callers(self, name: str) -> list:
+        """Objects that call, read or write an object, sorted."""
+        meta = self.lineage.get(name, {})
+        callers = {caller for key in CALLER_KEYS for caller in meta.get(key, [])}
+        callers.update(col["caller"] for col in meta.get("columns", []) if col.get("caller"))
+        return sorted(callers)
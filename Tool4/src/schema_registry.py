@@ -0,0 +1,84 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+import jsonschema
+
+# Tool4/schemas, a sibling of this src directory
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas")
+
+_validators = {}
+_timings = {}
+_lock = threading.Lock()
+
+
+def schema_path(schema_name: str) -> str:
+    """Path of a bundled schema, e.g. 'ast' -> schemas/ast_Schema.json."""
+    return os.path.join(SCHEMA_DIR, f"{schema_name}_Schema.json")
+
+
+def get_validator(schema_name: str):
+    """
+    Returns the compiled validator for a bundled schema.
+
+    The schema file is read, checked against its metaschema and compiled only
+    once per process; every later call (other files, other datasets, streamed
+    objects) reuses the same validator instance.
+    """
+    validator = _validators.get(schema_name)
+    if validator is not None:
+        return validator
+    with _lock:
+        if schema_name not in _validators:
+            with open(schema_path(schema_name), "r") as f:
+                schema = json.load(f)
+            validator_cls = jsonschema.validators.validator_for(schema)
+            validator_cls.check_schema(schema)
+            _validators[schema_name] = validator_cls(schema)
+        return _validators[schema_name]
+
+
+def _record_timing(schema_name: str, elapsed: float):
+    with _lock:
+        calls, total = _timings.get(schema_name, (0, 0.0))
+        _timings[schema_name] = (calls + 1, total + elapsed)
+
+
+def validate_instance(instance, schema_name: str):
+    """
+    Drop-in replacement for jsonschema.validate using the cached validator.
+
+    Raises jsonschema.exceptions.ValidationError with the same best-match
+    error that jsonschema.validate would report.
+    """
+    validator = get_validator(schema_name)
+    start = time.perf_counter()
+    try:
+        error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    finally:
+        _record_timing(schema_name, time.perf_counter() - start)
+    if error is not None:
+        raise error
+
+
+def collect_errors(instance, schema_name: str, max_errors: int) -> list:
+    """Returns at most max_errors validation errors, stopping the schema walk as soon as they are found."""
+    validator = get_validator(schema_name)
+    start = time.perf_counter()
+    try:
+        return list(itertools.islice(validator.iter_errors(instance), max_errors))
+    finally:
+        _record_timing(schema_name, time.perf_counter() - start)
+
+
+def validation_timings() -> dict:
+    """Cumulative {schema_name: (calls, seconds)} spent validating in this process."""
+    with _lock:
+        return dict(_timings)
+
+
+def format_validation_timings() -> str:
+    parts = [f"{name}: {calls} call(s), {total:.3f}s" for name, (calls, total) in sorted(validation_timings().items())]
+    return "Schema validation time - " + ("; ".join(parts) if parts else "none")
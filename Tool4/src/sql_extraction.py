@@ -0,0 +1,84 @@
+import re
+
+# Tokens that are never treated as column or object names.
+SQL_KEYWORDS = frozenset({
+    'SELECT', 'FROM', 'WHERE', 'INSERT', 'INTO', 'VALUES', 'UPDATE', 'SET', 'DELETE',
+    'JOIN', 'INNER', 'LEFT', 'RIGHT', 'OUTER', 'ON', 'GROUP', 'BY', 'ORDER', 'HAVING',
+    'AS', 'DISTINCT', 'TOP', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AND', 'OR', 'NOT',
+    'CREATE', 'TABLE', 'PROCEDURE', 'FUNCTION', 'TRIGGER', 'VIEW', 'INDEX', 'ALTER',
+    'DROP', 'TRUNCATE', 'DECLARE', 'EXEC', 'EXECUTE', 'CURSOR', 'FOR', 'OPEN', 'FETCH',
+    'CLOSE', 'DEALLOCATE', 'BEGIN', 'COMMIT', 'ROLLBACK', 'TRANSACTION', 'GO', 'PRINT',
+    'SUM', 'AVG', 'MAX', 'MIN', 'COUNT', 'CAST', 'CONVERT', 'GETDATE', 'YEAR', 'OVER',
+    'PARTITION', 'ROWS', 'BETWEEN', 'UNBOUNDED', 'PRECEDING', 'CURRENT', 'ROW', 'IS', 'NULL',
+    'RAISERROR', 'RETURN', 'WHILE', 'WITH', 'CTE', 'IN'
+})
+
+_IDENTIFIER_RE = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+_CALL_RE = re.compile(r'\b((?:[a-zA-Z0-9_]+\.)?[a-zA-Z0-9_]+)\s*\(')
+_ALIAS_RE = re.compile(r'\bAS\s+([a-zA-Z_][a-zA-Z0-9_]*)\b', re.IGNORECASE)
+
+# Memo tables. Schemas reuse the same few thousand identifiers over and over,
+# so both are cleared rather than evicted entry by entry once they grow large.
+_MEMO_LIMIT = 1 << 16
+_normalized_names = {}
+_identifier_keys = {}
+
+
+def _normalize_uncached(name: str) -> str:
+    if '.' in name or name.upper() in SQL_KEYWORDS or name.startswith('@'):
+        return name
+    return f"dbo.{name}"
+
+
+def normalize_name(name):
+    """Ensure object name has a schema, defaulting to 'dbo'."""
+    if not isinstance(name, str) or not name:
+        return name
+    normalized = _normalized_names.get(name)
+    if normalized is None:
+        if len(_normalized_names) >= _MEMO_LIMIT:
+            _normalized_names.clear()
+        normalized = _normalized_names[name] = _normalize_uncached(name)
+    return normalized
+
+
+def _identifier_key(identifier: str) -> str:
+    """
+    Returns the schema-qualified form of a bare identifier, or '' for SQL keywords.
+
+    Identifiers produced by _IDENTIFIER_RE never contain '.' or '@', so this is
+    normalize_name() with the keyword test folded in and a single memo lookup.
+    """
+    key = _identifier_keys.get(identifier)
+    if key is None:
+        if len(_identifier_keys) >= _MEMO_LIMIT:
+            _identifier_keys.clear()
+        key = _identifier_keys[identifier] = "" if identifier.upper() in SQL_KEYWORDS else f"dbo.{identifier}"
+    return key
+
+
+def extract_referenced_columns(sql_string: str, objects_to_exclude: set):
+    """Extracts potential column names from a targeted SQL string."""
+    if not sql_string: return ["*"]
+
+    # CHANGED: Normalize excluded objects to ensure accurate filtering.
+    normalized_exclude = {normalize_name(o) for o in objects_to_exclude}
+
+    actual_columns = set()
+    for col in set(_IDENTIFIER_RE.findall(sql_string)):
+        key = _identifier_key(col)
+        if key and col not in normalized_exclude and key not in normalized_exclude:
+            actual_columns.add(col)
+    return sorted(actual_columns) or ["*"]
+
+
+def extract_calls_from_expression(expression):
+    if not isinstance(expression, str): return []
+    # CHANGED: Return full, normalized names instead of stripping schemas.
+    return list({normalize_name(c) for c in _CALL_RE.findall(expression)})
+
+
+def extract_column_alias(column_expression: str):
+    """Returns the alias of a 'expr AS alias' select column, or None."""
+    match = _ALIAS_RE.search(column_expression)
+    return match.group(1) if match else None
@@ -30,12 +30,64 @@
 #         print('\033[91m'+ "Inconsistency between AST and Index file detected! Please Check your Inputs\n Error Type- Some procedures have been found which are present in the one of the files but not in the other"+'\033[0m')
 #         return False
     
-import os
 import json
+import time
 import jsonschema
 from src.logging_styles import Colours
+from src.ast_stream import iter_ast_objects, AST_SECTIONS
+from src.schema_registry import get_validator, validate_instance, collect_errors
 
-def validate(index_path: str, ast_path: str) -> bool:
+
+def _schema_errors(instance, schema_name: str, max_errors: int = None) -> list:
+    """
+    Returns the validation errors of an instance against a bundled schema.
+
+    By default this is the single best-match error jsonschema.validate would
+    raise; with max_errors the schema walk stops after the first N errors.
+    """
+    if max_errors is None:
+        try:
+            validate_instance(instance, schema_name)
+            return []
+        except jsonschema.exceptions.ValidationError as e:
+            return [e]
+    return collect_errors(instance, schema_name, max_errors)
+
+
+def _validate_ast_stream(ast_path: str, max_errors: int = None):
+    """
+    Validates the AST one object at a time and collects the object names per section.
+
+    Each streamed object is checked as a single-element section against the
+    full AST schema, so the definitions and $refs are reused unchanged.
+    Stops at the first invalid object, or after max_errors errors in total.
+    Returns (names by section, errors).
+    """
+    names = {section: set() for section in AST_SECTIONS}
+    positions = {section: 0 for section in AST_SECTIONS}
+    errors = []
+    for section, item in iter_ast_objects(ast_path):
+        remaining = None if max_errors is None else max_errors - len(errors)
+        item_errors = _schema_errors({section: [item]}, "ast", remaining)
+        for e in item_errors:
+            # Report the object's real position in its array instead of 0
+            if len(e.path) >= 2:
+                e.path[1] = positions[section]
+        errors.extend(item_errors)
+        if errors and (max_errors is None or len(errors) >= max_errors):
+            break
+        positions[section] += 1
+        if item.get(AST_SECTIONS[section]):
+            names[section].add(item[AST_SECTIONS[section]])
+    return names, errors
+
+
+def _print_schema_errors(errors: list):
+    for e in errors:
+        print(f"{Colours.RED}Schema validation failed: {e.message} in '{'.'.join(map(str, e.path))}'{Colours.RESET}")
+
+
+def validate(index_path: str, ast_path: str, streaming: bool = False, max_errors: int = None) -> bool:
     """
     Validates the ast.json and index.json files against their schemas
     and checks for consistency between them.
@@ -43,32 +95,29 @@ def validate(index_path: str, ast_path: str) -> bool:
     Args:
         index_path (str): The file path for the index.json file.
         ast_path (str): The file path for the ast.json file.
+        streaming (bool): Validate ast.json one object at a time instead of
+            loading it whole, for AST dumps that do not fit in memory.
+        max_errors (int): Report up to this many schema errors per file,
+            stopping as soon as they are found. By default only the single
+            most relevant error is reported.
 
     Returns:
         bool: True if both validation and consistency checks pass, False otherwise.
     """
-    # --- Corrected Path Resolution ---
-    # Get the directory of the current script (src)
-    src_dir = os.path.dirname(os.path.abspath(__file__))
-    # Go up one level to the main tool directory (Tool4)
-    tool_dir = os.path.dirname(src_dir)
-    # Define the absolute path to the schemas directory
-    schema_dir = os.path.join(tool_dir, "schemas")
-    
-    ast_schema_path = os.path.join(schema_dir, "ast_Schema.json")
-    # Corrected filename to match capitalization in screenshot
-    index_schema_path = os.path.join(schema_dir, "index_Schema.json")
-
     try:
         # Load all necessary files
         with open(index_path, "r") as f:
             index_data = json.load(f)
-        with open(ast_path, "r") as f:
-            ast_data = json.load(f)
-        with open(ast_schema_path, "r") as f:
-            ast_schema = json.load(f)
-        with open(index_schema_path, "r") as f:
-            index_schema = json.load(f)
+        if not streaming:
+            with open(ast_path, "r") as f:
+                ast_data = json.load(f)
+        else:
+            # Existence check only, the file is read lazily below
+            with open(ast_path, "r"):
+                pass
+        # Compiled once per process and reused for every later file
+        get_validator("ast")
+        get_validator("index")
 
     except FileNotFoundError as e:
         print(f"{Colours.RED}Error: Missing a required file: {e.filename}{Colours.RESET}")
@@ -80,15 +129,26 @@ def validate(index_path: str, ast_path: str) -> bool:
     # 1. Validate against JSON Schemas
     try:
         print("Validating ast.json against its schema...")
-        jsonschema.validate(instance=ast_data, schema=ast_schema)
-        print(f"{Colours.GREEN}AST schema validation successful.{Colours.RESET}")
+        start = time.perf_counter()
+        if streaming:
+            ast_names_by_section, errors = _validate_ast_stream(ast_path, max_errors)
+        else:
+            errors = _schema_errors(ast_data, "ast", max_errors)
+        if errors:
+            _print_schema_errors(errors)
+            return False
+        print(f"{Colours.GREEN}AST schema validation successful ({time.perf_counter() - start:.3f}s).{Colours.RESET}")
 
         print("Validating index.json against its schema...")
-        jsonschema.validate(instance=index_data, schema=index_schema)
-        print(f"{Colours.GREEN}Index schema validation successful.{Colours.RESET}")
+        start = time.perf_counter()
+        errors = _schema_errors(index_data, "index", max_errors)
+        if errors:
+            _print_schema_errors(errors)
+            return False
+        print(f"{Colours.GREEN}Index schema validation successful ({time.perf_counter() - start:.3f}s).{Colours.RESET}")
 
-    except jsonschema.exceptions.ValidationError as e:
-        print(f"{Colours.RED}Schema validation failed: {e.message} in '{'.'.join(map(str, e.path))}'{Colours.RESET}")
+    except (OSError, ValueError) as e:
+        print(f"{Colours.RED}Error: Invalid JSON in file: {ast_path}. Details: {e}{Colours.RESET}")
         return False
 
     # 2. Check for name consistency across all object types
@@ -102,7 +162,10 @@ def validate(index_path: str, ast_path: str) -> bool:
     print(f"\n{Colours.YELLOW}--- Starting Consistency Check ---{Colours.RESET}")
     for obj_type, name_key in key_map.items():
         index_names = set(index_data.get(obj_type, {}).keys())
-        ast_names = {item.get(name_key) for item in ast_data.get(obj_type, []) if item.get(name_key)}
+        if streaming:
+            ast_names = ast_names_by_section[obj_type]
+        else:
+            ast_names = {item.get(name_key) for item in ast_data.get(obj_type, []) if item.get(name_key)}
 
         # Debugging statements to show what is being compared
         print(f"\n{Colours.YELLOW}Checking consistency for {obj_type}...{Colours.RESET}")
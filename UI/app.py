@@ -6,7 +6,6 @@ import json
 from pathlib import Path
 import re
 from dotenv import load_dotenv
-import requests
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +19,12 @@ sys.path.append(project_root)
 from lineage_chat_bot.cli_chat_service import (
     _initialize_openai, _initialize_gemini, _initialize_azure, _initialize_openrouter
 )
+from lineage_chat_bot.context_builder import ChatContext
+# Same package name the chat's graph index uses, so the lineage graph module is loaded once
+from Tool4.src.lineage_graph import LineageGraph
+from Tool4.src.lineage_index import LineageNameIndex
+from Tool4.src.generate_mermaid import render_neighbourhood
+from lineage_chat_bot.chat_providers import stream_chat
 
 
 # ======================================================================================
@@ -63,11 +68,54 @@ st.markdown(
 # Data Loading
 # ======================================================================================
 
+# Parsed files are cached across reruns and sessions, keyed on path plus the
+# file's modification time and size, so a file rewritten on disk is read again
+# on the next rerun and unchanged files cost a dictionary lookup.
+# "🔄 Reload files" in the sidebar drops everything explicitly.
+
+def file_version(file_path):
+    """(mtime_ns, size) of a file or folder; part of every cache key."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _read_json(path, version):
+    # Data, not a resource: every caller gets its own copy, so one session's changes never reach another
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _read_text(path, version):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _split_markdown(path, version):
+    """Markdown and ```mermaid blocks of a file, alternating (odd positions are diagrams)."""
+    return re.split(r"```mermaid|```", _read_text(path, version))
+
+@st.cache_data(show_spinner=False, ttl=10)
+def list_files(directory, pattern, version):
+    """Sorted glob of a folder; re-run when the folder changes, and at most every 10s for files in subfolders."""
+    return sorted(Path(directory).glob(pattern))
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _lineage_graph(path, version):
+    return LineageGraph(_read_json(path, version))
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _name_index(path, version):
+    return LineageNameIndex(_read_json(path, version))
+
+def clear_data_caches():
+    """Forgets every cached file, listing, graph and index (chat clients are kept)."""
+    for cached in (_read_json, _read_text, _split_markdown, list_files, _lineage_graph, _name_index):
+        cached.clear()
+
 def load_json_file(file_path):
     """Loads a JSON file with error handling."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _read_json(str(file_path), file_version(file_path))
     except FileNotFoundError:
         st.error(f"🚨 Error: The file was not found at '{file_path}'. Please make sure it exists.")
         st.stop()
@@ -78,12 +126,40 @@ def load_json_file(file_path):
 def load_text_file(file_path):
     """Loads a plain text file (used for Mermaid diagrams / markdown)."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return _read_text(str(file_path), file_version(file_path))
+    except FileNotFoundError:
+        st.error(f"🚨 Error: The file was not found at '{file_path}'. Please make sure it exists.")
+        st.stop()
+
+def load_markdown_blocks(file_path):
+    """load_text_file, already split into markdown and mermaid blocks."""
+    try:
+        return _split_markdown(str(file_path), file_version(file_path))
     except FileNotFoundError:
         st.error(f"🚨 Error: The file was not found at '{file_path}'. Please make sure it exists.")
         st.stop()
 
+def glob_files(directory, pattern):
+    """Cached sorted glob; an empty list when the folder does not exist."""
+    if not directory.is_dir():
+        return []
+    return list_files(str(directory), pattern, file_version(directory))
+
+CLIENT_INITIALIZERS = {
+    "openai": _initialize_openai,
+    "azure openai": _initialize_azure,
+    "gemini": _initialize_gemini,
+    "openrouter": _initialize_openrouter,
+}
+
+@st.cache_resource(show_spinner=False)
+def get_chat_client(provider):
+    """One client per provider for the whole server; a failed initialisation raises and is retried next time."""
+    client = CLIENT_INITIALIZERS[provider]()
+    if client is None:
+        raise RuntimeError(f"Could not initialise the {provider} client; check its settings in the .env file.")
+    return client
+
 # ======================================================================================
 # Dynamic Mermaid Renderer
 # ======================================================================================
@@ -94,15 +170,24 @@ def render_mermaid_dynamic(mermaid_code: str, base_height: int = 400, multiplier
     height = min(max_height, base_height + line_count * multiplier)
     st_mermaid(mermaid_code.strip(), height=f"{height}px")
 
-def render_markdown_with_mermaid(md_text: str):
-    """Render markdown with embedded mermaid diagrams dynamically."""
-    blocks = re.split(r"```mermaid|```", md_text)
+def render_markdown_with_mermaid(blocks: list):
+    """Render markdown with embedded mermaid diagrams dynamically (blocks from load_markdown_blocks)."""
     for i, block in enumerate(blocks):
         if i % 2 == 1:  # Mermaid block
             render_mermaid_dynamic(block)
         else:  # Markdown block
             st.markdown(block)
 
+def get_lineage_graph(file_path):
+    """The adjacency index of a lineage file, built once per version of the file."""
+    return _lineage_graph(str(file_path), file_version(file_path))
+
+def get_name_index(file_path):
+    """The name/type search index of a lineage file, built once per version of the file."""
+    return _name_index(str(file_path), file_version(file_path))
+
+EXPLORER_PAGE_SIZE = 25
+
 # ======================================================================================
 # PATH LOGIC
 # ======================================================================================
@@ -111,21 +196,25 @@ project_root = app_dir.parent.resolve()
 output_dir = project_root / "output"
 
 # Find all lineage JSON files
-lineage_files = sorted(output_dir.glob("lineage*.json"))
+lineage_files = glob_files(output_dir, "lineage*.json")
 
 # Find all Mermaid diagram files
 diagram_dir = output_dir / "diagrams"
-diagram_files = sorted(diagram_dir.glob("*.mmd"))
+diagram_files = glob_files(diagram_dir, "*.mmd")
 
-# Find documentation files
+# Find documentation files (single documents and sharded folders with a manifest)
 docs_dir = output_dir / "documents"
-doc_files = sorted(docs_dir.glob("*.md"))
+doc_files = glob_files(docs_dir, "*.md")
+doc_manifests = glob_files(docs_dir, "*/index.json")
 
 # ======================================================================================
 # Sidebar File Selection
 # ======================================================================================
 st.sidebar.title("📂 File Selection")
 st.sidebar.markdown("Choose input files for the dashboard:")
+if st.sidebar.button("🔄 Reload files", help="Re-read every file from disk (changed files are also picked up automatically)."):
+    clear_data_caches()
+    st.rerun()
 
 # --- JSON selection ---
 if not lineage_files:
@@ -136,27 +225,32 @@ if not lineage_files:
 file_options = {file.name: file for file in lineage_files}
 selected_file_name = st.sidebar.selectbox("📄 Lineage JSON:", options=file_options.keys())
 selected_file_path = file_options[selected_file_name]
-lineage_data = load_json_file(selected_file_path)
 
 # --- Mermaid selection ---
-diagram_content = None
+# Precomputed diagrams cover the whole lineage and are only read when shown in full
+selected_diagram_path = None
 selected_diagram_name = None
 if diagram_files:
     diagram_options = {file.name: file for file in diagram_files}
     selected_diagram_name = st.sidebar.selectbox("🔗 Mermaid Diagram:", options=diagram_options.keys())
     selected_diagram_path = diagram_options[selected_diagram_name]
-    diagram_content = load_text_file(selected_diagram_path)
 else:
     st.sidebar.info("No Mermaid diagram files found in 'output/diagrams'.")
 
 # --- Documentation selection ---
-doc_content = None
+doc_blocks = None
+doc_manifest = None
 selected_doc_name = None
-if doc_files:
+if doc_files or doc_manifests:
     doc_options = {file.name: file for file in doc_files}
+    doc_options.update({f"{manifest.parent.name}/": manifest for manifest in doc_manifests})
     selected_doc_name = st.sidebar.selectbox("📘 Documentation:", options=doc_options.keys())
     selected_doc_path = doc_options[selected_doc_name]
-    doc_content = load_text_file(selected_doc_path)
+    if selected_doc_path.name == "index.json":
+        # Sharded documentation: only the manifest now, one object's file when selected
+        doc_manifest = load_json_file(selected_doc_path)
+    else:
+        doc_blocks = load_markdown_blocks(selected_doc_path)
 else:
     st.sidebar.info("No documentation files found in 'output/docs'.")
 
@@ -175,19 +269,76 @@ st.divider()
 col1, col2 = st.columns([1, 2])  # JSON smaller, Mermaid bigger
 
 with col1:
-    st.subheader("📊 Lineage JSON Data")
-    st.json(lineage_data, expanded=True)
+    # Only one page of names and one object's details are sent to the browser
+    st.subheader("📊 Lineage Explorer")
+    name_index = get_name_index(selected_file_path)
+    search_col, type_col = st.columns([2, 1])
+    with search_col:
+        query = st.text_input("Search objects:", key="explorer_query")
+    with type_col:
+        type_filter = st.selectbox("Type:", options=["all"] + sorted(name_index.type_counts), key="explorer_type")
+    obj_type = None if type_filter == "all" else type_filter
+    total = name_index.search(query, obj_type, limit=0)["total"]
+    pages = max(1, -(-total // EXPLORER_PAGE_SIZE))
+    if st.session_state.get("explorer_page", 1) > pages:
+        # The filter changed and the old page no longer exists
+        st.session_state["explorer_page"] = 1
+    page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, step=1, key="explorer_page")
+    result = name_index.search(query, obj_type, offset=(page - 1) * EXPLORER_PAGE_SIZE, limit=EXPLORER_PAGE_SIZE)
+    st.caption(f"{total:,} of {len(name_index):,} objects")
+    explored_object = None
+    if result["names"]:
+        st.dataframe([name_index.row(name) for name in result["names"]], hide_index=True, use_container_width=True)
+        explored_object = st.selectbox("Show details of:", options=result["names"], key="explorer_object")
+        explored = name_index.lineage.get(explored_object, {})
+        st.markdown(f"**{explored_object}** ({explored.get('type', 'unknown')})")
+        if explored.get("on_table"):
+            st.markdown(f"On table: `{explored['on_table']}` {explored.get('event', '')}")
+        if explored.get("columns"):
+            st.markdown("Columns:")
+            st.dataframe(explored["columns"], hide_index=True, use_container_width=True)
+        explored_callers = name_index.callers(explored_object)
+        if explored_callers:
+            st.markdown("Callers: " + ", ".join(f"`{name}`" for name in explored_callers))
+        if explored.get("calls"):
+            st.markdown("Calls: " + ", ".join(f"`{name}`" for name in explored["calls"]))
+    else:
+        st.info("No objects match the search.")
 
 with col2:
-    if diagram_content:
-        st.subheader("🔗 Mermaid Diagram (Preview)")
-        render_mermaid_dynamic(diagram_content)
+    st.subheader("🎯 Focused Diagram")
+    # Centred on the object selected in the explorer, so no list of every name is sent
+    focus_object = explored_object
+    if focus_object is None:
+        st.info("Select an object in the Lineage Explorer to see its neighbourhood.")
+    else:
+        lineage_graph = get_lineage_graph(selected_file_path)
+        st.caption(f"Focus: **{focus_object}**")
+        focus_columns = sorted({c["name"] for c in lineage_graph.lineage.get(focus_object, {}).get("columns", [])
+                                if c.get("name")})
+        focus_column = None
+        if focus_columns:
+            focus_column = st.selectbox("Column (optional):", options=["(whole table)"] + focus_columns,
+                                        key="focus_column")
+        hops_col, direction_col = st.columns(2)
+        with hops_col:
+            hops = st.slider("Hops:", min_value=1, max_value=4, value=1, key="focus_hops")
+        with direction_col:
+            direction = st.radio("Direction:", options=["both", "upstream", "downstream"], horizontal=True,
+                                 key="focus_direction")
+        focus = (focus_object, focus_column) if focus_column and focus_column != "(whole table)" else focus_object
+        focused_diagram, focused_stats = render_neighbourhood(lineage_graph, focus, hops=hops, direction=direction)
+        caption = f"{focused_stats['objects']} objects, {focused_stats['nodes']} nodes, {focused_stats['edges']} edges"
+        if focused_stats["truncated"]:
+            caption += " (limited; reduce hops or pick a narrower focus)"
+        st.caption(caption)
+        render_mermaid_dynamic(focused_diagram)
 
 # --- Full-width Mermaid section ---
-if diagram_content:
+if selected_diagram_path and st.toggle(f"📈 Show full precomputed diagram ({selected_diagram_name})", value=False):
     st.divider()
     st.subheader("📈 Mermaid Diagram (Full Width)")
-    render_mermaid_dynamic(diagram_content, base_height=800, multiplier=60, max_height=2000)
+    render_mermaid_dynamic(load_text_file(selected_diagram_path), base_height=800, multiplier=60, max_height=2000)
 
 # ======================================================================================
 # Documentation & Chat Assistant Section
@@ -199,9 +350,16 @@ doc_col, chat_col = st.columns(2, gap="large")
 with doc_col:
     st.subheader("📘 Business Logic Documentation")
     with st.container(border=True):
-        if doc_content:
+        if doc_manifest:
+            sections = {section["title"]: section for section in doc_manifest.get("sections", [])}
+            st.caption(f"From folder: {selected_doc_name} ({len(sections)} sections, "
+                       f"{doc_manifest.get('total_bytes', 0) / 1024:,.0f} KB)")
+            selected_section = st.selectbox("Section:", options=list(sections), key="doc_section")
+            if selected_section:
+                render_markdown_with_mermaid(load_markdown_blocks(selected_doc_path.parent / sections[selected_section]["file"]))
+        elif doc_blocks:
             st.caption(f"From file: {selected_doc_name}")
-            render_markdown_with_mermaid(doc_content)
+            render_markdown_with_mermaid(doc_blocks)
         else:
             st.info("No documentation file selected. Content will appear here.")
 
@@ -259,17 +417,8 @@ with chat_col:
                 st.session_state["provider"] = providers[selected_provider]
                 st.session_state["model"] = selected_model
                 st.session_state["chat_started"] = True
-                st.session_state["messages"] = [
-                    {"role": "system", "content": (
-                        "You are a helpful assistant that answers questions based on the lineage data. "
-                        "Your purpose is to help the user gain better insights from the lineage. "
-                        "Help them understand what effects any changes will have and in general how the data flows. "
-                        "Do not answer any queries outside your scope; politely refuse when asked. "
-                        "Try to be concise and give accurate answers. Explain in detail only when explicitly asked "
-                        "or when it is absolutely necessary."
-                    )},
-                    {"role": "user", "content": f"Here is the data lineage in JSON:\n {json.dumps(lineage_data, indent=2)}"}
-                ]
+                # Selects the lineage and history sent with each question
+                st.session_state["chat_context"] = ChatContext(load_json_file(selected_file_path))
             else:
                 st.session_state["rag_chat_started"] = True
 
@@ -278,76 +427,33 @@ with chat_col:
             st.markdown(f"**Provider:** {selected_provider} | **Model:** {selected_model}")
             st.divider()
 
-            # Display conversation (skip system + lineage context)
-            for msg in st.session_state["messages"][2:]:
+            # Display conversation
+            context = st.session_state["chat_context"]
+            for msg in context.history:
                 with st.chat_message(msg["role"]):
                     st.markdown(msg["content"])
 
             # Chat input
             if user_input := st.chat_input("Ask your question..."):
-                st.session_state["messages"].append({"role": "user", "content": user_input})
+                messages = context.build_messages(user_input)
                 provider = st.session_state["provider"]
                 model = st.session_state["model"]
                 answer = ""
 
                 try:
-                    if provider == "openai":
-                        client = _initialize_openai()
-                        response_stream = client.chat.completions.create(
-                            model=model,
-                            messages=st.session_state["messages"],
-                            stream=True
-                        )
-                        answer = ""
-                        stream_container = st.empty()
-                        for chunk in response_stream:
-                            delta = getattr(chunk.choices[0].delta, "content", "")
-                            if delta is not None:
-                                answer += delta
-                                stream_container.markdown(f"**Assistant:** {answer}")
-
-                    elif provider == "azure openai":
-                        client = _initialize_azure()
-                        azure_deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-                        response = client.chat.completions.create(
-                            model=azure_deployment_name,
-                            messages=st.session_state["messages"],
-                            stream=False
-                        )
-                        answer = response.choices[0].message.content
-                        st.markdown(f"**Assistant:** {answer}")
-
-                    elif provider == "gemini":
-                        client = _initialize_gemini()
-                        prompt = '\n'.join([m['content'] for m in st.session_state["messages"] if m['role'] in ['user', 'assistant']])
-                        response = client.models.generate_content(
-                            model=model,
-                            contents=prompt
-                        )
-                        answer = response.text
-                        st.markdown(f"**Assistant:** {answer}")
-
-                    elif provider == "openrouter":
-                        api_key = _initialize_openrouter()
-                        if not api_key:
-                            answer = "⚠️ Missing OpenRouter API key."
-                        else:
-                            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-                            payload = {"model": model, "messages": st.session_state["messages"], "temperature": 0.7}
-                            resp = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-                            resp.raise_for_status()
-                            data = resp.json()
-                            answer = data["choices"][0]["message"]["content"].strip()
-                            st.markdown(f"**Assistant:** {answer}")
-
-                    else:
-                        answer = "Unknown LLM provider."
+                    client = get_chat_client(provider)
+                    stream = stream_chat(provider, client, model, messages, context.prefix_length)
+                    stream_container = st.empty()
+                    for delta in stream:
+                        answer += delta
+                        stream_container.markdown(f"**Assistant:** {answer}")
+                    context.record_usage(stream.usage, stream.latency_s, stream.ttft_s)
 
                 except Exception as e:
                     answer = f"❌ Error: {e}"
 
                 # Save assistant response
-                st.session_state["messages"].append({"role": "assistant", "content": answer.strip()})
+                context.record_turn(user_input, answer.strip())
                 st.rerun()
 
         # RAG Chatbot UI
@@ -0,0 +1,97 @@
+"""
+Connection reuse of Tool3's pooled LLM clients, measured against a local stub server.
+
+Starts an HTTP/1.1 keep-alive server on localhost that answers like the
+OpenRouter chat completions endpoint, points OPENROUTER_BASE_URL at it and
+sends --requests prompts through a GenerationEngine, first with a bare
+requests.post per call (the previous behaviour) and then through
+llm_service's shared client pool. Reports requests/sec and how many TCP
+connections the server accepted.
+
+Usage (from the repository root):
+    python benchmarks/bench_client_pool.py [--requests 200] [--workers 4]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Tool3"))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; without this, Nagle's algorithm
+        # and the client's delayed ACK add ~40ms to every reused connection.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def do_POST(self):
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["messages"][-1]["content"]
+        body = json.dumps({"choices": [{"message": {"content": f"Stub description for: {prompt[:20]}"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, engine_cls, send, prompts):
+    StubHandler.connections = 0
+    engine = engine_cls("openrouter")
+    start = time.perf_counter()
+    results = list(engine.map(send, [((p,), {}) for p in prompts]))
+    elapsed = time.perf_counter() - start
+    assert all(r.startswith("Stub description") for r in results), results[0]
+    print(f"{label:<10} {len(prompts)} requests in {elapsed:6.3f}s -> {len(prompts) / elapsed:8.1f} req/s, "
+          f"{StubHandler.connections} TCP connection(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Prompts sent per variant.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent in-flight requests (LLM_CONCURRENCY_OPENROUTER).")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ["OPEN_ROUTER"] = "stub-key"
+    os.environ["LLM_CONCURRENCY_OPENROUTER"] = str(args.workers)
+
+    import requests
+    import llm_service
+    from generation_engine import GenerationEngine
+
+    def unpooled(prompt):
+        headers = {"Authorization": "Bearer stub-key", "Content-Type": "application/json"}
+        payload = {"model": llm_service.OPENROUTER_MODEL, "messages": [{"role": "user", "content": prompt}]}
+        response = requests.post(f"{base_url}/chat/completions", headers=headers, json=payload)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    prompts = [f"Describe procedure number {i}" for i in range(args.requests)]
+    run("per-call", GenerationEngine, unpooled, prompts)
+    run("pooled", GenerationEngine, llm_service._generate_with_openrouter, prompts)
+    print(llm_service.CLIENT_POOL.report())
+    llm_service.CLIENT_POOL.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
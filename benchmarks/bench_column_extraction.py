@@ -0,0 +1,113 @@
+"""
+Micro-benchmark for the column/call extraction hot path of Tool4's lineage analysis.
+
+Collects every SQL fragment that analyze_lineage feeds to the extractors from
+input/ast/ast*.json, repeats the corpus SCALE times (1000 by default) and
+reports identifiers/sec for the original inline-regex implementation and for
+src.sql_extraction. Results of both implementations are checked to be equal.
+
+Usage (from the repository root):
+    python benchmarks/bench_column_extraction.py [--scale 1000]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Tool4"))
+
+from src.analyze_lineage import get_strings_from_node  # noqa: E402
+from src.sql_extraction import SQL_KEYWORDS, extract_calls_from_expression, extract_referenced_columns  # noqa: E402
+
+
+# --- Original implementation, kept verbatim for comparison ---
+def legacy_normalize_name(name):
+    if not isinstance(name, str) or '.' in name or not name:
+        return name
+    if name.upper() in SQL_KEYWORDS or name.startswith('@'):
+        return name
+    return f"dbo.{name}"
+
+
+def legacy_extract_referenced_columns(sql_string, objects_to_exclude):
+    if not sql_string: return ["*"]
+    normalized_exclude = {legacy_normalize_name(o) for o in objects_to_exclude}
+    potential_identifiers = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', sql_string)
+    actual_columns = {
+        col for col in potential_identifiers
+        if col.upper() not in SQL_KEYWORDS
+        and not col.startswith('@')
+        and col not in normalized_exclude
+        and legacy_normalize_name(col) not in normalized_exclude
+    }
+    return sorted(list(actual_columns)) or ["*"]
+
+
+def legacy_extract_calls_from_expression(expression):
+    if not isinstance(expression, str): return []
+    pattern = r'\b((?:[a-zA-Z0-9_]+\.)?[a-zA-Z0-9_]+)\s*\('
+    calls = re.findall(pattern, expression)
+    return list(set([legacy_normalize_name(c) for c in calls]))
+
+
+def collect_corpus():
+    """Returns (sql_string, objects_to_exclude) pairs shaped like the ones analyze_lineage builds."""
+    corpus = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "type" in node and isinstance(node.get("type"), str):
+                strings = list(node.get("columns", [])) if isinstance(node.get("columns"), list) else []
+                strings = [s for s in strings if isinstance(s, str)]
+                strings += get_strings_from_node(node.get("where", {}))
+                strings += get_strings_from_node(node.get("set", {}))
+                exclude = {t for t in (node.get("from"), node.get("table")) if isinstance(t, str)}
+                if strings:
+                    corpus.append((" ".join(strings), exclude))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    for path in sorted(glob.glob(os.path.join(ROOT, "input", "ast", "ast*.json"))):
+        with open(path, "r") as f:
+            walk(json.load(f))
+    return corpus
+
+
+def run(label, corpus, scale, extract_columns, extract_calls):
+    identifier_re = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+    identifiers = sum(len(identifier_re.findall(sql)) for sql, _ in corpus) * scale
+    start = time.perf_counter()
+    for _ in range(scale):
+        for sql, exclude in corpus:
+            extract_columns(sql, exclude)
+            extract_calls(sql)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {identifiers:>12,} identifiers in {elapsed:7.3f}s  ->  {identifiers / elapsed:>14,.0f} identifiers/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1000, help="How many times to repeat the bundled corpus.")
+    args = parser.parse_args()
+
+    corpus = collect_corpus()
+    for sql, exclude in corpus:
+        assert extract_referenced_columns(sql, exclude) == legacy_extract_referenced_columns(sql, exclude)
+        assert sorted(extract_calls_from_expression(sql)) == sorted(legacy_extract_calls_from_expression(sql))
+    print(f"Corpus: {len(corpus)} SQL fragments x {args.scale}")
+
+    before = run("before", corpus, args.scale, legacy_extract_referenced_columns, legacy_extract_calls_from_expression)
+    after = run("after", corpus, args.scale, extract_referenced_columns, extract_calls_from_expression)
+    print(f"Speed-up: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
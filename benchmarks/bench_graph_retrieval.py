@@ -0,0 +1,123 @@
+"""
+Latency of the lineage graph index versus vector search for structural questions.
+
+Merges output/lineage*.json, replicates it --scale times under new schema
+names and asks structural questions ("who writes <table>.<column>", "what
+calls <proc>") through:
+
+  graph   rag.graph_index.LineageGraphIndex.lookup
+  vector  the rag.query vector path: a HashEmbedder query embedding and
+          collection.query on an ephemeral Chroma collection holding every
+          chunk. The real path embeds with OpenAI instead, which adds an
+          HTTP request per question that is not counted here.
+
+Usage (from the repository root):
+    python benchmarks/bench_graph_retrieval.py [--scale 200] [--questions 500]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+import chromadb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "lineage_chat_bot", "rag"))
+
+from batch_ingestion import iter_batches  # noqa: E402
+from embedders import HashEmbedder  # noqa: E402
+from lineage_chat_bot.rag.graph_index import LineageGraphIndex  # noqa: E402
+from json_to_text import convert_json_to_text_chunks  # noqa: E402
+
+
+def build_lineage(scale):
+    base = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "output", "lineage*.json"))):
+        with open(path, "r") as f:
+            base.update(json.load(f))
+
+    def rename(name, i):
+        schema, _, obj = name.rpartition(".")
+        return f"{schema or 'dbo'}{i}.{obj}"
+
+    lineage = {}
+    for i in range(scale):
+        for name, obj in base.items():
+            copy = json.loads(json.dumps(obj))
+            for key in ("calls", "called_by", "called_by_procedure", "called_by_function", "called_by_trigger"):
+                if key in copy:
+                    copy[key] = [rename(n, i) for n in copy[key]]
+            for col in copy.get("columns", []):
+                col["caller"] = rename(col["caller"], i)
+            if "on_table" in copy:
+                copy["on_table"] = rename(copy["on_table"], i)
+            lineage[rename(name, i)] = copy
+    return lineage
+
+
+def make_questions(lineage, count):
+    rng = random.Random(42)
+    tables = [(n, o) for n, o in lineage.items() if o.get("type") == "table" and o.get("columns")]
+    routines = [n for n, o in lineage.items() if o.get("type") != "table"]
+    questions = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            name, obj = rng.choice(tables)
+            questions.append(f"who writes {name}.{rng.choice(obj['columns'])['name']}?")
+        else:
+            questions.append(f"what calls {rng.choice(routines)}?")
+    return questions
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=200, help="Copies of the bundled lineage to index.")
+    parser.add_argument("--questions", type=int, default=500, help="Structural questions to ask.")
+    args = parser.parse_args()
+
+    lineage = build_lineage(args.scale)
+    questions = make_questions(lineage, args.questions)
+
+    start = time.perf_counter()
+    graph = LineageGraphIndex(lineage)
+    build_s = time.perf_counter() - start
+    print(f"{len(lineage):,} lineage objects; graph index built in {build_s * 1000:.1f} ms")
+
+    graph_latency = []
+    for q in questions:
+        start = time.perf_counter()
+        chunks = graph.lookup(q)
+        graph_latency.append(time.perf_counter() - start)
+        assert chunks, q
+
+    embedder = HashEmbedder()
+    collection = chromadb.EphemeralClient().get_or_create_collection("bench_graph_retrieval")
+    chunks = convert_json_to_text_chunks(lineage)
+    start = time.perf_counter()
+    for batch in iter_batches(chunks, 1000):
+        texts = [c["text"] for c in batch]
+        collection.add(ids=[c["id"] for c in batch], embeddings=embedder.embed(texts), documents=texts)
+    print(f"{len(chunks):,} chunks added to an ephemeral Chroma collection in {time.perf_counter() - start:.1f} s")
+
+    vector_latency = []
+    for q in questions:
+        start = time.perf_counter()
+        collection.query(query_embeddings=embedder.embed([q]), n_results=3)
+        vector_latency.append(time.perf_counter() - start)
+
+    for label, samples in (("graph", graph_latency), ("vector", vector_latency)):
+        p50, p95 = percentiles(samples)
+        print(f"{label:<7} {len(samples):>5} questions   p50 {p50 * 1e6:>12,.1f} us   p95 {p95 * 1e6:>12,.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Start-up cost of the command-line entry points, measured with `python -X importtime`.
+
+Each entry point is imported (not run) in a fresh interpreter from the
+repository root, the way run_all.py launches it. The best of --repeat runs is
+reported together with the slowest direct imports of the entry point and whether any of the
+heavy LLM SDKs were pulled in before a provider was chosen.
+
+Usage (from the repository root):
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 5]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# label -> (directory put on sys.path, module imported)
+ENTRY_POINTS = {
+    "run_tool3": ("Tool3", "run_tool3"),
+    "run_tool4": ("Tool4", "run_tool4"),
+    "chatbot cli": ("lineage_chat_bot", "main"),
+    "chatbot service": (".", "lineage_chat_bot.cli_chat_service"),
+}
+
+# Imports that should only happen once a provider has actually been selected.
+HEAVY_SDKS = ("google.generativeai", "google.genai", "openai", "anthropic", "chromadb")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(path_dir, module):
+    """Returns (total_us, [(cumulative_us, direct_import)], imported module names) for one cold import."""
+    code = f"import sys; sys.path.insert(0, {os.path.join(ROOT, path_dir)!r}); import {module}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    # Children are printed before their parent, two extra spaces of indent per level
+    total, children, direct, imported = 0, [], [], set()
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        imported.add(name)
+        if indent == 3:
+            children.append((cumulative, name))
+        elif indent == 1:
+            total += cumulative
+            if name == module:
+                direct = children
+            children = []
+    return total, direct, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per entry point; the fastest is kept.")
+    parser.add_argument("--top", type=int, default=5, help="How many of the slowest direct imports to list.")
+    args = parser.parse_args()
+
+    for label, (path_dir, module) in ENTRY_POINTS.items():
+        try:
+            runs = [measure(path_dir, module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{label:<16} failed to import: {e}")
+            continue
+        total, direct, imported = min(runs, key=lambda r: r[0])
+        sdks = sorted(sdk for sdk in HEAVY_SDKS if sdk in imported)
+        print(f"{label:<16} {total / 1000:8.1f} ms   heavy SDKs imported: {', '.join(sdks) or 'none'}")
+        for us, name in sorted(direct, reverse=True)[:args.top]:
+            print(f"{'':<16} {us / 1000:8.1f} ms   {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Paging through a large lineage with LineageNameIndex versus sending it whole.
+
+Replicates the bundled lineage --scale times (as bench_neighbourhood_diagram
+does), builds the name index and times searches for random name fragments,
+each returning the first page of matches. The JSON a page of explorer rows
+amounts to is compared with the whole document that st.json used to ship
+to the browser.
+
+Usage (from the repository root):
+    python benchmarks/bench_lineage_search.py [--scale 2000] [--samples 300] [--page-size 25]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Tool4"))
+
+from bench_neighbourhood_diagram import build_lineage  # noqa: E402
+from src.lineage_index import LineageNameIndex  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=2000, help="Copies of the bundled lineage to index.")
+    parser.add_argument("--samples", type=int, default=300, help="Searches to time.")
+    parser.add_argument("--page-size", type=int, default=25, help="Rows per page.")
+    args = parser.parse_args()
+
+    lineage = build_lineage(args.scale)
+    full_bytes = len(json.dumps(lineage, indent=2))
+    start = time.perf_counter()
+    index = LineageNameIndex(lineage)
+    print(f"{len(lineage):,} lineage objects ({full_bytes / 1024 / 1024:.1f} MB as st.json input); "
+          f"index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(42)
+    names = list(lineage)
+    latency, totals, page_bytes = [], [], []
+    for _ in range(args.samples):
+        name = rng.choice(names).lower()
+        cut = rng.randrange(len(name))
+        query = name[cut:cut + rng.randint(2, 8)]
+        obj_type = rng.choice([None, "table", "procedure"])
+        start = time.perf_counter()
+        result = index.search(query, obj_type, limit=args.page_size)
+        rows = [index.row(n) for n in result["names"]]
+        latency.append(time.perf_counter() - start)
+        totals.append(result["total"])
+        page_bytes.append(len(json.dumps(rows)))
+    latency.sort()
+    print(f"search + page: p50 {latency[len(latency) // 2] * 1000:.2f} ms, "
+          f"p95 {latency[int(len(latency) * 0.95) - 1] * 1000:.2f} ms, max {latency[-1] * 1000:.2f} ms, "
+          f"avg {sum(totals) / len(totals):,.0f} matches, avg page {sum(page_bytes) / len(page_bytes) / 1024:.1f} KB")
+
+    start = time.perf_counter()
+    for page in range(10):
+        index.search(query, obj_type, offset=page * args.page_size, limit=args.page_size)
+    print(f"next pages of the last search: {(time.perf_counter() - start) / 10 * 1000:.3f} ms each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Latency of on-demand neighbourhood diagrams versus rendering the whole lineage.
+
+Merges output/lineage*.json, replicates it --scale times under new schema
+names, builds a LineageGraph once and then renders the k-hop neighbourhood
+of random objects with src.generate_mermaid.render_neighbourhood. The full
+diagram (what UI/app.py used to load) is rendered once for comparison.
+
+Usage (from the repository root):
+    python benchmarks/bench_neighbourhood_diagram.py [--scale 200] [--hops 2] [--samples 300]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Tool4"))
+
+from src.generate_mermaid import build_diagram, render_neighbourhood  # noqa: E402
+from src.lineage_graph import LineageGraph  # noqa: E402
+
+
+def build_lineage(scale):
+    base = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "output", "lineage*.json"))):
+        with open(path, "r") as f:
+            base.update(json.load(f))
+
+    def rename(name, i):
+        schema, _, obj = name.rpartition(".")
+        return f"{schema or 'dbo'}{i}.{obj}"
+
+    lineage = {}
+    for i in range(scale):
+        for name, obj in base.items():
+            copy = json.loads(json.dumps(obj))
+            for key in ("calls", "called_by", "called_by_procedure", "called_by_function", "called_by_trigger"):
+                if key in copy:
+                    copy[key] = [rename(n, i) for n in copy[key]]
+            for col in copy.get("columns", []):
+                col["caller"] = rename(col["caller"], i)
+            if "on_table" in copy:
+                copy["on_table"] = rename(copy["on_table"], i)
+            lineage[rename(name, i)] = copy
+    return lineage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=200, help="Copies of the bundled lineage to index.")
+    parser.add_argument("--hops", type=int, default=2, help="Neighbourhood radius.")
+    parser.add_argument("--samples", type=int, default=300, help="Focus objects to render.")
+    args = parser.parse_args()
+
+    lineage = build_lineage(args.scale)
+    start = time.perf_counter()
+    graph = LineageGraph(lineage)
+    print(f"{len(lineage):,} lineage objects; graph built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    _, full = build_diagram(lineage)
+    print(f"full diagram: {full['nodes']:,} nodes, {full['edges']:,} edges, {full['chars']:,} chars "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    latency, sizes = [], []
+    for name in random.Random(42).sample(list(lineage), min(args.samples, len(lineage))):
+        start = time.perf_counter()
+        _, stats = render_neighbourhood(graph, name, hops=args.hops)
+        latency.append(time.perf_counter() - start)
+        sizes.append(stats["chars"])
+    latency.sort()
+    print(f"{args.hops}-hop neighbourhood: p50 {latency[len(latency) // 2] * 1000:.2f} ms, "
+          f"p95 {latency[int(len(latency) * 0.95) - 1] * 1000:.2f} ms, max {latency[-1] * 1000:.2f} ms, "
+          f"avg {sum(sizes) / len(sizes):,.0f} chars")
+
+
+if __name__ == "__main__":
+    main()
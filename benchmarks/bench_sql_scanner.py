@@ -0,0 +1,78 @@
+"""
+Throughput of the single-pass SQL object scanner (Tool3/sql_scanner.py).
+
+Builds a synthetic T-SQL script of about --mb megabytes by repeating the
+bundled input/test/*.sql scripts with renamed objects, then measures:
+
+  scanner  sql_scanner.scan_sql_file, reading the file in 1 MB chunks
+  regex    the three CREATE ... AS BEGIN(.*?)END DOTALL patterns previously
+           used by doc_generator, on the first --regex-mb megabytes (they
+           need the whole script in memory and stop at the first inner END)
+
+Usage (from the repository root):
+    python benchmarks/bench_sql_scanner.py [--mb 100] [--regex-mb 10]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Tool3"))
+
+from sql_scanner import scan_sql_file  # noqa: E402
+
+_NAME_RE = re.compile(r"(CREATE\s+(?:PROCEDURE|FUNCTION|TRIGGER)\s+[\w.]+)", re.IGNORECASE)
+LEGACY_PATTERNS = [
+    re.compile(rf"CREATE\s+{kind}\s+(\w+).*?AS\s+BEGIN(.*?)END", re.DOTALL | re.IGNORECASE)
+    for kind in ("PROCEDURE", "FUNCTION", "TRIGGER")
+]
+
+
+def write_script(path, target_bytes):
+    scripts = []
+    for sql_path in sorted(glob.glob(os.path.join(ROOT, "input", "test", "*.sql"))):
+        with open(sql_path, "r", encoding="utf-8") as f:
+            # Every object ends its batch so repeated copies stay independent
+            scripts.append(f.read().rstrip() + "\nGO\n")
+    written, copy = 0, 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target_bytes:
+            for script in scripts:
+                chunk = _NAME_RE.sub(lambda m: f"{m.group(1)}_{copy}", script)
+                f.write(chunk)
+                written += len(chunk.encode("utf-8"))
+            copy += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=100, help="Size of the synthetic script in MB.")
+    parser.add_argument("--regex-mb", type=float, default=10, help="MB given to the legacy regex extraction.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "script.sql")
+        size = write_script(path, int(args.mb * 1024 * 1024))
+        mb = size / (1024 * 1024)
+
+        start = time.perf_counter()
+        count = sum(1 for _ in scan_sql_file(path))
+        elapsed = time.perf_counter() - start
+        print(f"scanner  {mb:8.1f} MB  {count:>8,} objects  {elapsed:7.2f} s  {mb / elapsed:7.1f} MB/s")
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read(int(args.regex_mb * 1024 * 1024))
+        start = time.perf_counter()
+        count = sum(1 for pattern in LEGACY_PATTERNS for _ in pattern.finditer(text))
+        elapsed = time.perf_counter() - start
+        regex_mb = len(text.encode("utf-8")) / (1024 * 1024)
+        print(f"regex    {regex_mb:8.1f} MB  {count:>8,} objects  {elapsed:7.2f} s  {regex_mb / elapsed:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+from lineage_chat_bot.context_builder import apply_cache_control
+
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+# Oldest Azure OpenAI API version (date part) that accepts stream_options
+AZURE_STREAM_USAGE_MIN_VERSION = "2024-09-01"
+
+
+def _gemini_prompt(messages):
+    # Gemini expects a single string prompt, so concatenate context
+    return '\n'.join([m['content'] for m in messages if m['role'] in ['user', 'assistant']])
+
+
+def _stream_openai(client, model, messages, prefix_length, include_usage=True):
+    options = {"stream_options": {"include_usage": True}} if include_usage else {}
+    response_stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        **options
+    )
+    for chunk in response_stream:
+        # The final chunk carries only the usage, with no choices
+        if getattr(chunk, "usage", None) is not None:
+            yield {"usage": chunk.usage}
+        if not chunk.choices:
+            continue
+        delta = getattr(chunk.choices[0].delta, "content", None)
+        if delta:
+            yield delta
+
+
+def _stream_azure(client, model, messages, prefix_length):
+    # Azure addresses the model by its deployment name
+    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or model
+    # API versions before 2024-09-01-preview reject stream_options with a 400,
+    # so token usage is only reported from that version on
+    api_version = os.getenv("AZURE_OPENAI_API_VERSION") or ""
+    include_usage = api_version[:10] >= AZURE_STREAM_USAGE_MIN_VERSION
+    yield from _stream_openai(client, deployment, messages, prefix_length, include_usage)
+
+
+def _stream_gemini(client, model, messages, prefix_length):
+    usage = None
+    for chunk in client.models.generate_content_stream(model=model, contents=_gemini_prompt(messages)):
+        usage = getattr(chunk, "usage_metadata", None) or usage
+        if chunk.text:
+            yield chunk.text
+    # Every chunk repeats the running totals; the last one is complete
+    if usage is not None:
+        yield {"usage": usage}
+
+
+def iter_sse_data(lines):
+    """
+    Yields the decoded JSON payloads of a server-sent event stream.
+
+    Comment lines (OpenRouter sends ': OPENROUTER PROCESSING' keep-alives) and
+    other fields are skipped, multi-line data fields are joined, and the
+    stream ends at 'data: [DONE]'.
+    """
+    data = []
+    for line in lines:
+        if line:
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip(" "))
+            continue
+        # A blank line dispatches the event
+        if data:
+            payload = "\n".join(data)
+            data = []
+            if payload == "[DONE]":
+                return
+            yield json.loads(payload)
+    if data and "\n".join(data) != "[DONE]":
+        yield json.loads("\n".join(data))
+
+
+def _stream_openrouter(client, model, messages, prefix_length):
+    import requests
+
+    headers = {"Authorization": f"Bearer {client}", "Content-Type": "application/json"}
+    payload = {
+        "model": model,
+        # Cache breakpoint after the static system prompt + lineage prefix
+        "messages": apply_cache_control(messages, prefix_length),
+        "temperature": 0.7,
+        "stream": True,
+        "usage": {"include": True}
+    }
+    with requests.post(f"{OPENROUTER_BASE_URL}/chat/completions", headers=headers, json=payload, stream=True) as resp:
+        resp.raise_for_status()
+        # SSE is always UTF-8; without a charset requests would guess Latin-1
+        resp.encoding = "utf-8"
+        for event in iter_sse_data(resp.iter_lines(decode_unicode=True)):
+            if "error" in event:
+                raise RuntimeError(event["error"].get("message", event["error"]))
+            if event.get("usage"):
+                yield {"usage": event["usage"]}
+            choices = event.get("choices") or []
+            delta = choices[0].get("delta", {}).get("content") if choices else None
+            if delta:
+                yield delta
+
+
+STREAMERS = {
+    "openai": _stream_openai,
+    "azure openai": _stream_azure,
+    "gemini": _stream_gemini,
+    "openrouter": _stream_openrouter,
+}
+
+
+class ChatStream:
+    """
+    Iterates over the text deltas of one chat completion, for any provider.
+
+    While iterating it accumulates the full answer in `text` and records the
+    provider-reported `usage`, the time to first token (`ttft_s`) and the total
+    latency (`latency_s`), which are logged when the stream ends.
+    """
+
+    def __init__(self, provider, events):
+        self.provider = provider
+        self._events = events
+        self.text = ""
+        self.usage = None
+        self.ttft_s = None
+        self.latency_s = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for event in self._events:
+            if isinstance(event, dict):
+                self.usage = event["usage"]
+                continue
+            if self.ttft_s is None:
+                self.ttft_s = time.perf_counter() - start
+            self.text += event
+            yield event
+        self.latency_s = time.perf_counter() - start
+        ttft = f"{self.ttft_s:.2f}s" if self.ttft_s is not None else "n/a"
+        print(f"⚡ {self.provider}: first token after {ttft}, complete after {self.latency_s:.2f}s")
+
+
+def stream_chat(provider, client, model, messages, prefix_length=0) -> ChatStream:
+    """
+    Starts a streaming chat completion with the given provider client.
+
+    `client` is what the matching _initialize_* helper in cli_chat_service
+    returns (the API key for OpenRouter). `prefix_length` is the number of
+    leading messages that never change (ChatContext.prefix_length) and is used
+    for OpenRouter's prompt cache breakpoint. The request is sent when the
+    returned ChatStream is first iterated.
+    """
+    streamer = STREAMERS.get(provider)
+    if streamer is None:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    if client is None:
+        raise RuntimeError(f"{provider} client is not configured.")
+    return ChatStream(provider, streamer(client, model, messages, prefix_length))
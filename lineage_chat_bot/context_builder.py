@@ -0,0 +1,259 @@
+import json
+import os
+from collections import deque
+from dotenv import load_dotenv
+from lineage_chat_bot.rag.graph_index import LineageGraphIndex
+
+load_dotenv()
+
+# Approximate token budgets per request. The lineage budget covers the lineage
+# JSON sent with a question; the history budget covers earlier turns.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKENS", "8000"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKENS", "2000"))
+# Most recent question/answer pairs that are always sent verbatim (budget permitting)
+RECENT_TURNS = int(os.getenv("CHAT_RECENT_TURNS", "3"))
+# Characters kept from each side of an older turn in the running summary
+SUMMARY_CHARS = 200
+# Mark the static prefix for providers with explicit prompt caching (OpenRouter); "0" disables it
+PROMPT_CACHE_ENABLED = os.getenv("CHAT_PROMPT_CACHE", "1") != "0"
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that answers questions based on the lineage data. "
+    "Your purpose is to help the user gain better insights from the lineage. "
+    "Help them understand what effects any changes will have and in general how the data flows. "
+    "Do not answer any queries outside your scope; politely refuse when asked. "
+    "Try to be concise and give accurate answers. Explain in detail only when explicitly asked "
+    "or when it is absolutely necessary."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English and JSON)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def _compact_json(data) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _clip(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _field(obj, *names):
+    """First present field of a usage object or dict, walking dotted names."""
+    for name in names:
+        value = obj
+        for part in name.split("."):
+            value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+            if value is None:
+                break
+        if value is not None:
+            return value
+    return None
+
+
+def extract_usage(usage) -> dict:
+    """
+    Normalises provider usage fields to input, cached input and output tokens.
+
+    Understands OpenAI / Azure / OpenRouter ('prompt_tokens_details.cached_tokens'),
+    Gemini ('usage_metadata.cached_content_token_count') and Anthropic
+    ('cache_read_input_tokens') shapes. Returns {} when usage is missing.
+    """
+    if usage is None:
+        return {}
+    input_tokens = _field(usage, "prompt_tokens", "prompt_token_count", "input_tokens") or 0
+    cached = _field(usage, "prompt_tokens_details.cached_tokens", "cached_content_token_count",
+                    "cache_read_input_tokens") or 0
+    output_tokens = _field(usage, "completion_tokens", "candidates_token_count", "output_tokens") or 0
+    if _field(usage, "cache_read_input_tokens") is not None:
+        # Anthropic reports cached tokens separately from input_tokens
+        input_tokens += cached + (_field(usage, "cache_creation_input_tokens") or 0)
+    return {"input_tokens": input_tokens, "cached_input_tokens": cached,
+            "fresh_input_tokens": max(0, input_tokens - cached), "output_tokens": output_tokens}
+
+
+def apply_cache_control(messages: list, prefix_length: int) -> list:
+    """
+    Returns messages with an ephemeral cache breakpoint on the last static prefix message.
+
+    This is the OpenRouter form of explicit prompt caching (used by Anthropic
+    and Gemini models); providers that cache prefixes automatically ignore it.
+    """
+    if not PROMPT_CACHE_ENABLED or prefix_length <= 0:
+        return messages
+    marked = list(messages)
+    last = marked[prefix_length - 1]
+    marked[prefix_length - 1] = {
+        "role": last["role"],
+        "content": [{"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}],
+    }
+    return marked
+
+
+class ChatContext:
+    """
+    Assembles the messages sent to the LLM for each question of a lineage chat.
+
+    If the whole lineage fits in the token budget it is sent once, right after
+    the system prompt, and stays byte-identical across turns. Otherwise only
+    the objects named in the question and their neighbours (breadth-first over
+    calls, callers, tables and triggers) are attached to that question, as
+    many as fit. Older turns are folded into a short summary so the history
+    cost stays bounded, and the estimated tokens of every request are logged.
+
+    The system prompt and the full lineage always come first and never change
+    during a session (prefix_length messages), so providers with prompt caching
+    can serve them from cache; record_usage() logs how much actually was.
+    """
+
+    def __init__(self, lineage: dict, system_prompt: str = SYSTEM_PROMPT, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 history_budget: int = HISTORY_TOKEN_BUDGET, recent_turns: int = RECENT_TURNS):
+        self.lineage = lineage
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.history_budget = history_budget
+        self.recent_turns = recent_turns
+        self.history = []
+        self.usage_log = []
+
+        full = _compact_json(lineage)
+        self.full_lineage_fits = estimate_tokens(full) <= token_budget
+        self._full_lineage_message = f"Here is the data lineage in JSON:\n{full}" if self.full_lineage_fits else None
+        self._graph = None if self.full_lineage_fits else LineageGraphIndex(lineage)
+        self._object_tokens = {}
+        # Leading messages identical on every turn: system prompt (+ full lineage)
+        self.prefix_length = 2 if self.full_lineage_fits else 1
+
+    def _tokens_of(self, name):
+        tokens = self._object_tokens.get(name)
+        if tokens is None:
+            tokens = self._object_tokens[name] = estimate_tokens(_compact_json({name: self.lineage[name]}))
+        return tokens
+
+    def select_subgraph(self, question: str) -> dict:
+        """The part of the lineage relevant to a question that fits in the token budget."""
+        seeds = self._graph.mentioned_objects(question)
+        queue = deque(seeds)
+        seen = set(seeds)
+        # Questions that name nothing get the lineage in its stored order, as much as fits
+        fallback = iter(() if seeds else self.lineage)
+        selected, used = {}, 0
+        while True:
+            if queue:
+                name = queue.popleft()
+            else:
+                name = next((n for n in fallback if n not in seen), None)
+                if name is None:
+                    break
+                seen.add(name)
+            cost = self._tokens_of(name)
+            if used + cost > self.token_budget:
+                if name in seeds:
+                    continue
+                break
+            selected[name] = self.lineage[name]
+            used += cost
+            for neighbour in sorted(self._graph.neighbors(name)):
+                if neighbour in self.lineage and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return selected
+
+    def _history_messages(self):
+        """Recent turns verbatim, older ones summarised, within the history budget."""
+        recent, used = [], 0
+        turns = [self.history[i:i + 2] for i in range(0, len(self.history), 2)]
+        kept = 0
+        for turn in reversed(turns):
+            cost = sum(estimate_tokens(m["content"]) for m in turn)
+            if kept >= self.recent_turns or used + cost > self.history_budget:
+                break
+            recent[:0] = turn
+            used += cost
+            kept += 1
+
+        older = turns[:len(turns) - kept]
+        summary_lines = []
+        for turn in reversed(older):
+            question = _clip(turn[0]["content"], SUMMARY_CHARS)
+            answer = _clip(turn[1]["content"], SUMMARY_CHARS) if len(turn) > 1 else ""
+            line = f"- Q: {question} | A: {answer}"
+            if used + estimate_tokens(line) > self.history_budget:
+                break
+            summary_lines.insert(0, line)
+            used += estimate_tokens(line)
+        if summary_lines:
+            dropped = len(older) - len(summary_lines)
+            header = "Summary of the earlier conversation"
+            if dropped:
+                header += f" ({dropped} older exchange(s) omitted)"
+            recent.insert(0, {"role": "user", "content": header + ":\n" + "\n".join(summary_lines)})
+        return recent
+
+    def build_messages(self, question: str) -> list:
+        """Returns the messages to send for a new question and logs their estimated size."""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        lineage_tokens = 0
+        if self.full_lineage_fits:
+            messages.append({"role": "user", "content": self._full_lineage_message})
+            lineage_tokens = estimate_tokens(self._full_lineage_message)
+
+        history = self._history_messages()
+        messages.extend(history)
+
+        content = question
+        if not self.full_lineage_fits:
+            subgraph = self.select_subgraph(question)
+            context = (f"Relevant part of the data lineage in JSON ({len(subgraph)} of {len(self.lineage)} objects):\n"
+                       f"{_compact_json(subgraph)}")
+            lineage_tokens = estimate_tokens(context)
+            content = f"{context}\n\nQuestion: {question}"
+        messages.append({"role": "user", "content": content})
+
+        usage = {
+            "turn": len(self.history) // 2 + 1,
+            "system": estimate_tokens(self.system_prompt),
+            "lineage": lineage_tokens,
+            "history": sum(estimate_tokens(m["content"]) for m in history),
+            "question": estimate_tokens(question),
+        }
+        usage["total"] = usage["system"] + usage["lineage"] + usage["history"] + usage["question"]
+        self.usage_log.append(usage)
+        print(f"🧮 Turn {usage['turn']}: ~{usage['total']} tokens sent (lineage {usage['lineage']}, "
+              f"history {usage['history']}, question {usage['question']})")
+        return messages
+
+    def record_usage(self, usage, latency_s: float = None, ttft_s: float = None) -> dict:
+        """
+        Adds the provider-reported usage of the latest request to the usage log.
+
+        Logs cached versus fresh input tokens so the effect of prompt caching
+        on large lineages is visible alongside the response latency and, for
+        streamed answers, the time to first token.
+        """
+        normalized = extract_usage(usage)
+        if latency_s is not None:
+            normalized["latency_s"] = latency_s
+        if ttft_s is not None:
+            normalized["ttft_s"] = ttft_s
+        if not normalized or not self.usage_log:
+            return normalized
+        self.usage_log[-1].update(normalized)
+        if "input_tokens" in normalized:
+            line = (f"💾 Turn {self.usage_log[-1]['turn']}: {normalized['cached_input_tokens']} of "
+                    f"{normalized['input_tokens']} input tokens from prompt cache "
+                    f"({normalized['fresh_input_tokens']} fresh), {normalized['output_tokens']} output")
+            if latency_s is not None:
+                line += f", {latency_s:.2f}s"
+            if ttft_s is not None:
+                line += f" (first token {ttft_s:.2f}s)"
+            print(line)
+        return normalized
+
+    def record_turn(self, question: str, answer: str):
+        """Adds a completed question/answer pair to the conversation."""
+        self.history.append({"role": "user", "content": question})
+        self.history.append({"role": "assistant", "content": answer})
@@ -3,23 +3,22 @@ import json
 import hashlib
 import chromadb
 from chromadb.config import Settings
-from openai import OpenAI
 from dotenv import load_dotenv
 from json_to_text import convert_json_to_text_chunks
+from embedders import get_embedder
+from batch_ingestion import SYNC_STAMP_KEY, sync_chunks, format_ingestion_stats
 
 # Load environment variables
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
 LINEAGE_PATH = os.getenv("LINEAGE_PATH", "output/lineage1.json")
 CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "lineage_chunks")
+METADATA_FILE = "./chroma_db/ingestion_metadata.json"
 
 # Initialize Chroma client with persistent storage
 chroma_client = chromadb.PersistentClient(path="./chroma_db")
-collection = chroma_client.get_or_create_collection(CHROMA_COLLECTION)
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Embedder selected by RAG_EMBEDDER (OpenAI by default)
+embedder = get_embedder()
 
 def get_file_hash(file_path):
     """Calculate MD5 hash of a file to detect changes."""
@@ -33,9 +32,8 @@ def get_file_hash(file_path):
 def get_stored_metadata():
     """Get metadata about the last ingested file."""
     try:
-        metadata_file = "./chroma_db/ingestion_metadata.json"
-        if os.path.exists(metadata_file):
-            with open(metadata_file, 'r') as f:
+        if os.path.exists(METADATA_FILE):
+            with open(METADATA_FILE, 'r') as f:
                 return json.load(f)
     except:
         pass
@@ -47,15 +45,43 @@ def save_ingestion_metadata(file_path, file_hash, chunk_count):
         "last_ingested_file": file_path,
         "file_hash": file_hash,
         "chunk_count": chunk_count,
+        "embedder": embedder.model,
+        "embedding_dim": embedder.dim,
         "ingestion_timestamp": str(__import__('datetime').datetime.now())
     }
     
-    metadata_file = "./chroma_db/ingestion_metadata.json"
-    os.makedirs(os.path.dirname(metadata_file), exist_ok=True)
+    os.makedirs(os.path.dirname(METADATA_FILE), exist_ok=True)
     
-    with open(metadata_file, 'w') as f:
+    with open(METADATA_FILE, 'w') as f:
         json.dump(metadata, f, indent=2)
 
+def get_collection():
+    """
+    The lineage collection as currently stored.
+
+    clear_collection drops and recreates it, so callers fetch it here
+    instead of holding on to a collection object.
+    """
+    return chroma_client.get_or_create_collection(CHROMA_COLLECTION)
+
+def embedder_changed(stored_metadata):
+    """True unless the last ingestion used the current embedder and vector size (older metadata records neither)."""
+    return (stored_metadata.get("embedder") != embedder.model
+            or stored_metadata.get("embedding_dim", "unknown") != embedder.dim)
+
+def collection_version(current=None):
+    """
+    Identifies the current contents of the collection (or of current, if given).
+
+    sync_chunks stamps the collection's metadata whenever it writes, whether
+    called from auto_ingest, ingestion.py or another process, and a
+    recreated collection gets a new id, so the result changes whenever the
+    stored chunks do. The metadata is read from the store on each call
+    rather than from a cached collection object.
+    """
+    current = current or get_collection()
+    return (str(current.id), (current.metadata or {}).get(SYNC_STAMP_KEY), current.count())
+
 def needs_reingestion():
     """Check if re-ingestion is needed."""
     current_hash = get_file_hash(LINEAGE_PATH)
@@ -67,6 +93,11 @@ def needs_reingestion():
     stored_file = stored_metadata.get("last_ingested_file")
     stored_hash = stored_metadata.get("file_hash")
     
+    # Check if the embedding model changed
+    if embedder_changed(stored_metadata):
+        print(f"🧬 Embedder changed: {stored_metadata.get('embedder', 'unknown')} → {embedder.model}")
+        return True
+
     # Check if file path changed
     if stored_file != LINEAGE_PATH:
         print(f"📄 File path changed: {stored_file} → {LINEAGE_PATH}")
@@ -82,23 +113,23 @@ def needs_reingestion():
 
 def embed_text(text):
     """Generate embeddings for text."""
-    response = openai_client.embeddings.create(
-        input=text,
-        model=EMBED_MODEL
-    )
-    return response.data[0].embedding
+    return embedder.embed([text])[0]
 
 def clear_collection():
-    """Clear the existing collection data."""
-    # Delete all documents in the collection
+    """
+    Drops the collection and returns a new, empty one.
+
+    Deleting the documents alone is not enough: Chroma fixes a collection's
+    vector dimension with its first write, so a different embedder needs a
+    fresh collection.
+    """
     try:
-        # Get all IDs
-        all_data = collection.get()
-        if all_data['ids']:
-            collection.delete(ids=all_data['ids'])
-            print(f"🗑️  Cleared {len(all_data['ids'])} existing documents")
+        count = get_collection().count()
+        chroma_client.delete_collection(CHROMA_COLLECTION)
+        print(f"🗑️  Dropped collection '{CHROMA_COLLECTION}' ({count} existing documents)")
     except Exception as e:
-        print(f"⚠️  Could not clear collection: {e}")
+        print(f"⚠️  Could not drop collection: {e}")
+    return get_collection()
 
 def auto_ingest():
     """Automatically ingest data if needed."""
@@ -111,8 +142,10 @@ def auto_ingest():
     print("🚀 Starting automatic ingestion...")
     
     try:
-        # Clear existing data
-        clear_collection()
+        # Vectors from a different embedding model (or of another size) cannot be mixed with new ones
+        collection = get_collection()
+        if embedder_changed(get_stored_metadata()):
+            collection = clear_collection()
         
         # Load and convert lineage JSON to text chunks
         with open(LINEAGE_PATH, "r", encoding="utf-8") as f:
@@ -121,20 +154,9 @@ def auto_ingest():
         text_chunks = convert_json_to_text_chunks(lineage_json)
         print(f"📝 Converted JSON to {len(text_chunks)} text chunks")
         
-        # Process each chunk
-        for i, chunk in enumerate(text_chunks, 1):
-            embedding = embed_text(chunk["text"])
-            safe_metadata = {"id": chunk["id"]}
-            
-            collection.add(
-                ids=[chunk["id"]],
-                embeddings=[embedding],
-                documents=[chunk["text"]],
-                metadatas=[safe_metadata]
-            )
-            
-            if i % 3 == 0:  # Progress indicator
-                print(f"📊 Processed {i}/{len(text_chunks)} chunks...")
+        # Only chunks whose content hash changed are re-embedded; vanished ids are deleted
+        stats = sync_chunks(collection, text_chunks, embedder)
+        print(format_ingestion_stats(stats))
         
         # Save metadata
         file_hash = get_file_hash(LINEAGE_PATH)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Chunks per embeddings request / Chroma write
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+# Collection metadata key holding the time of the last sync that changed it
+SYNC_STAMP_KEY = "last_sync_ns"
+
+
+def iter_batches(items, batch_size):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def content_hash(text, embedder):
+    """Hash of a chunk's text and the embedding model, stored with the chunk in Chroma."""
+    model = getattr(embedder, "model", type(embedder).__name__)
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _write_batch(collection, batch, embeddings, embedder):
+    collection.upsert(
+        ids=[chunk["id"] for chunk in batch],
+        embeddings=embeddings,
+        documents=[chunk["text"] for chunk in batch],
+        metadatas=[{"id": chunk["id"], "content_hash": content_hash(chunk["text"], embedder)} for chunk in batch]
+    )
+
+
+def ingest_chunks(collection, text_chunks, embedder, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embeds text chunks in batches and bulk-writes them to a Chroma collection.
+
+    Each batch costs one embedding request and one collection write. The write
+    of batch N runs on a background thread while batch N+1 is being embedded,
+    so the network round-trip and the Chroma write overlap. Returns throughput
+    statistics for the run.
+    """
+    batch_size = max(1, batch_size)
+    start = time.perf_counter()
+    batches = 0
+    pending = None
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer") as writer:
+        for batch in iter_batches(text_chunks, batch_size):
+            embeddings = embedder.embed([chunk["text"] for chunk in batch])
+            if pending is not None:
+                pending.result()  # At most one write in flight; re-raises write errors
+            pending = writer.submit(_write_batch, collection, batch, embeddings, embedder)
+            batches += 1
+            print(f"📊 Embedded {min(batches * batch_size, len(text_chunks))}/{len(text_chunks)} chunks...")
+        if pending is not None:
+            pending.result()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "chunks": len(text_chunks),
+        "batches": batches,
+        "batch_size": batch_size,
+        "embedder": getattr(embedder, "model", type(embedder).__name__),
+        "seconds": elapsed,
+        "chunks_per_s": (len(text_chunks) / elapsed) if elapsed else 0.0,
+    }
+
+
+def plan_delta(collection, text_chunks, embedder):
+    """
+    Compares the chunks against what the collection already holds.
+
+    Returns (changed, vanished_ids): the chunks that are new or whose content
+    hash differs from the stored one, and the ids stored in the collection
+    that no longer exist in text_chunks.
+    """
+    existing = collection.get(include=["metadatas"])
+    stored = {
+        chunk_id: (metadata or {}).get("content_hash")
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"] or [{}] * len(existing["ids"]))
+    }
+    changed = [chunk for chunk in text_chunks if stored.get(chunk["id"]) != content_hash(chunk["text"], embedder)]
+    current_ids = {chunk["id"] for chunk in text_chunks}
+    vanished = [chunk_id for chunk_id in stored if chunk_id not in current_ids]
+    return changed, vanished
+
+
+def stamp_collection(collection):
+    """
+    Records the current time under SYNC_STAMP_KEY in the collection's metadata.
+
+    Retrieval caches key on it (see auto_ingestion.collection_version), so
+    they notice a write made by any script or process.
+    """
+    # Chroma rejects hnsw:* settings in modify(); they were fixed at creation
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+    metadata[SYNC_STAMP_KEY] = time.time_ns()
+    collection.modify(metadata=metadata)
+
+
+def sync_chunks(collection, text_chunks, embedder, batch_size=EMBED_BATCH_SIZE):
+    """
+    Brings the collection in line with text_chunks by re-embedding only what changed.
+
+    Unchanged chunks are left alone, changed and new ones are embedded and
+    upserted through ingest_chunks, and ids that disappeared are deleted.
+    If anything was written, the collection is stamped with stamp_collection.
+    """
+    changed, vanished = plan_delta(collection, text_chunks, embedder)
+    for batch in iter_batches(vanished, max(1, batch_size) * 16):
+        collection.delete(ids=batch)
+    stats = ingest_chunks(collection, changed, embedder, batch_size)
+    if changed or vanished:
+        stamp_collection(collection)
+    stats["unchanged"] = len(text_chunks) - len(changed)
+    stats["deleted"] = len(vanished)
+    return stats
+
+
+def format_ingestion_stats(stats):
+    line = (
+        f"⚡ {stats['chunks']} chunks in {stats['batches']} batch(es) of {stats['batch_size']} "
+        f"with {stats['embedder']}: {stats['seconds']:.2f}s, {stats['chunks_per_s']:.1f} chunks/sec"
+    )
+    if "unchanged" in stats:
+        line += f" ({stats['unchanged']} unchanged, {stats['deleted']} deleted)"
+    return line
@@ -1,6 +1,10 @@
 import os
+import sys
 from openai import OpenAI
 from dotenv import load_dotenv
+
+# query imports the graph index as lineage_chat_bot.rag.graph_index, so the project root must be importable
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 from query import retrieve
 from auto_ingestion import auto_ingest
 
@@ -0,0 +1,90 @@
+import hashlib
+import math
+import os
+import re
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
+# "openai" (default) or "hash" for the offline, deterministic embedder
+RAG_EMBEDDER = os.getenv("RAG_EMBEDDER", "openai")
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+# Vector sizes of the OpenAI embedding models (None for models not listed)
+OPENAI_EMBED_DIMS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class OpenAIEmbedder:
+    """Embeds a whole batch of texts with a single OpenAI embeddings request."""
+
+    name = "openai"
+
+    def __init__(self, model=EMBED_MODEL, api_key=OPENAI_API_KEY):
+        self.model = model
+        self.dim = OPENAI_EMBED_DIMS.get(model)
+        self._api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first use so importing the RAG modules stays cheap
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key)
+        return self._client
+
+    def embed(self, texts):
+        """Returns one embedding per text, in the same order."""
+        if not texts:
+            return []
+        response = self.client.embeddings.create(input=list(texts), model=self.model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class HashEmbedder:
+    """
+    Deterministic local embedder (feature hashing of word tokens).
+
+    Needs no network or API key and gives the same vector for the same text in
+    every process, so ingestion and retrieval can be exercised offline. Texts
+    that share identifiers (table, column and procedure names) end up close.
+    """
+
+    name = "hash"
+
+    def __init__(self, dim=384):
+        self.model = f"hash-{dim}"
+        self.dim = dim
+
+    def _embed_one(self, text):
+        vector = [0.0] * self.dim
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dim] += 1.0 if (value >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed(self, texts):
+        """Returns one embedding per text, in the same order."""
+        return [self._embed_one(text) for text in texts]
+
+
+EMBEDDERS = {
+    "openai": OpenAIEmbedder,
+    "hash": HashEmbedder,
+}
+
+
+def get_embedder(name=None):
+    """Returns the embedder selected by name or the RAG_EMBEDDER environment variable."""
+    name = (name or RAG_EMBEDDER).lower()
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder '{name}'. Choose one of: {', '.join(EMBEDDERS)}")
+    return EMBEDDERS[name]()
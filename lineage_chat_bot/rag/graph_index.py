@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from dotenv import load_dotenv
+# Imported as a package from the project root, like lineage_chat_bot itself
+from Tool4.src.lineage_graph import LineageGraph
+
+# Load environment variables
+load_dotenv()
+LINEAGE_PATH = os.getenv("LINEAGE_PATH", "output/lineage1.json")
+
+_MENTION_RE = re.compile(r"[A-Za-z_@#][\w@#$]*(?:\.[A-Za-z_@#][\w@#$]*)*")
+_WRITE_RE = re.compile(r"\b(writes?|writing|written|updates?|updating|updated|inserts?|inserting|inserted|"
+                       r"modif(?:y|ies|ied)|deletes?|deleting|populates?|changes?)\b")
+_READ_RE = re.compile(r"\b(reads?|reading|selects?|selecting|uses?|using|used|queries|query|accesses|access|depends?)\b")
+_CALL_RE = re.compile(r"\b(calls?|calling|called|callers?|invokes?|invoking|invoked|executes?|executed)\b")
+_MAX_MENTIONS = 5
+
+
+class LineageGraphIndex(LineageGraph):
+    """
+    Tool4's LineageGraph plus name resolution and text answers for the chat.
+
+    Answers structural questions ("who writes dbo.Orders.Status", "what calls
+    usp_WriteAudit") with dictionary lookups instead of an embedding request
+    and a vector search. Object names can be given with or without their
+    schema and in any case.
+    """
+
+    def __init__(self, lineage: dict):
+        super().__init__(lineage)
+        self._aliases = defaultdict(set)
+        self._column_names = defaultdict(dict)
+        for name, obj in lineage.items():
+            self._aliases[name.lower()].add(name)
+            self._aliases[name.rsplit(".", 1)[-1].lower()].add(name)
+            if obj.get("type") == "table":
+                for col in obj.get("columns", []):
+                    self._column_names[name].setdefault(col["name"].lower(), col["name"])
+
+    def resolve(self, mention: str) -> list:
+        """
+        Resolves a name from a question to ("object", name) or ("column", table, column) entries.
+
+        Returns every match, e.g. usp_WriteAudit in two schemas, or an empty list.
+        """
+        key = mention.lower()
+        if key in self._aliases:
+            return [("object", name) for name in sorted(self._aliases[key])]
+        prefix, _, column = key.rpartition(".")
+        if not prefix or prefix not in self._aliases:
+            return []
+        matches = []
+        for table in sorted(self._aliases[prefix]):
+            column_name = self._column_names.get(table, {}).get(column)
+            if column_name:
+                matches.append(("column", table, column_name))
+        return matches
+
+    def _resolve_mentions(self, question):
+        seen = set()
+        for mention in _MENTION_RE.findall(question):
+            for match in self.resolve(mention.strip(".")):
+                if match not in seen:
+                    seen.add(match)
+                    yield match
+
+    def mentioned_objects(self, question: str) -> list:
+        """Lineage objects named in a question, in order of mention (a column counts as its table)."""
+        names = []
+        for match in self._resolve_mentions(question):
+            name = match[1]
+            if name not in names:
+                names.append(name)
+        return names
+
+    def _type(self, name, default="unknown"):
+        return self.lineage.get(name, {}).get("type", default)
+
+    def _label(self, name):
+        return f"{name} ({self._type(name)})"
+
+    def _labels(self, names):
+        return ", ".join(self._label(n) for n in sorted(names)) or "none"
+
+    def describe_column(self, table, column, intent=None) -> str:
+        writers = self.column_writers.get((table, column), ())
+        readers = self.column_readers.get((table, column), ())
+        lines = [f"Column: {table}.{column}"]
+        if intent != "read":
+            lines.append(f"  Written by: {self._labels(writers)}")
+        if intent != "write":
+            lines.append(f"  Read by: {self._labels(readers)}")
+        return "\n".join(lines)
+
+    def describe_object(self, name, intent=None) -> str:
+        lines = [f"{self._type(name, 'object').title()}: {name}"]
+        if self._type(name) == "table":
+            lines.append(f"  Accessed by: {self._labels(self.accessed_by.get(name, ()))}")
+            if self.triggers_on.get(name):
+                lines.append(f"  Triggers: {self._labels(self.triggers_on[name])}")
+            for entry in self.lineage[name].get("columns", []):
+                if intent in (None, entry["usage"]) or intent == "call":
+                    lines.append(f"    - {entry['name']} ({entry['usage']}) by {entry['caller']} [{entry['caller_type']}]")
+            return "\n".join(lines)
+
+        if name in self.events:
+            table, event = self.events[name]
+            lines.append(f"  Fires on: {table} {event}".rstrip())
+        lines.append(f"  Calls: {self._labels(self.calls.get(name, ()))}")
+        lines.append(f"  Called by: {self._labels(self.called_by.get(name, ()))}")
+        accesses = defaultdict(set)
+        for table, entry in self.column_access.get(name, ()):
+            accesses[(table, entry["usage"])].add(entry["name"])
+        for (table, usage), cols in sorted(accesses.items()):
+            if intent in (None, "call", usage):
+                lines.append(f"  {'Writes' if usage == 'write' else 'Reads'} {table}: {', '.join(sorted(cols))}")
+        return "\n".join(lines)
+
+    def lookup(self, question: str) -> list:
+        """
+        Returns context chunks for the lineage objects and columns named in a question.
+
+        The chunks have the same shape as rag.query.retrieve results, with
+        metadata source "graph". An empty list means nothing in the question
+        matched the lineage, and the caller should fall back to vector search.
+        """
+        lowered = question.lower()
+        intent = None
+        if _WRITE_RE.search(lowered):
+            intent = "write"
+        elif _READ_RE.search(lowered):
+            intent = "read"
+        elif _CALL_RE.search(lowered):
+            intent = "call"
+
+        chunks = []
+        for match in self._resolve_mentions(question):
+            if match[0] == "column":
+                text = self.describe_column(match[1], match[2], intent)
+                chunk_id = f"{match[1]}.{match[2]}"
+            else:
+                text = self.describe_object(match[1], intent)
+                chunk_id = match[1]
+            chunks.append({"document": text, "metadata": {"id": chunk_id, "source": "graph"}})
+            if len(chunks) >= _MAX_MENTIONS:
+                break
+        return chunks
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def load_graph_index(lineage_path=LINEAGE_PATH):
+    """
+    Returns the graph index for a lineage file, building it on first use.
+
+    The index is rebuilt only when the file's modification time changes, so
+    it follows Tool4 re-runs without re-reading the JSON on every question.
+    Returns None if the file does not exist.
+    """
+    try:
+        mtime = os.stat(lineage_path).st_mtime_ns
+    except OSError:
+        return None
+    with _load_lock:
+        cached = _loaded.get(lineage_path)
+        if cached is None or cached[0] != mtime:
+            with open(lineage_path, "r", encoding="utf-8") as f:
+                cached = _loaded[lineage_path] = (mtime, LineageGraphIndex(json.load(f)))
+        return cached[1]
@@ -3,14 +3,13 @@ import os
 import json
 import chromadb
 from chromadb.config import Settings
-from openai import OpenAI
 from dotenv import load_dotenv
 from json_to_text import convert_json_to_text_chunks
+from embedders import get_embedder
+from batch_ingestion import sync_chunks, format_ingestion_stats
 
 # Load environment variables
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
 LINEAGE_PATH = os.getenv("LINEAGE_PATH", "output/lineage1.json")
 CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "lineage_chunks")
 LINEAGE_TEXT_PATH = os.getenv("LINEAGE_TEXT_PATH", "output/lineage_text_chunks.json")
@@ -19,15 +18,11 @@ LINEAGE_TEXT_PATH = os.getenv("LINEAGE_TEXT_PATH", "output/lineage_text_chunks.j
 chroma_client = chromadb.PersistentClient(path="./chroma_db")
 collection = chroma_client.get_or_create_collection(CHROMA_COLLECTION)
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Embedder selected by RAG_EMBEDDER (OpenAI by default)
+embedder = get_embedder()
 
 def embed_text(text):
-    response = openai_client.embeddings.create(
-        input=text,
-        model=EMBED_MODEL
-    )
-    return response.data[0].embedding
+    return embedder.embed([text])[0]
 
 def sanitize_metadata(metadata):
     # Convert lists/dicts to strings for Chroma compatibility
@@ -39,15 +34,8 @@ def main():
         lineage_json = json.load(f)
     text_chunks = convert_json_to_text_chunks(lineage_json)
     print(text_chunks)
-    for chunk in text_chunks:
-        embedding = embed_text(chunk["text"])
-        safe_metadata = {"id": chunk["id"]}
-        collection.add(
-            ids=[chunk["id"]],
-            embeddings=[embedding],
-            documents=[chunk["text"]],
-            metadatas=[safe_metadata]
-        )
+    stats = sync_chunks(collection, text_chunks, embedder)
+    print(format_ingestion_stats(stats))
     print(f"Ingested {len(text_chunks)} text chunks into Chroma collection '{CHROMA_COLLECTION}'.")
 
 if __name__ == "__main__":
@@ -1,32 +1,64 @@
 import os
+import sys
+import threading
+
+if __name__ == "__main__":
+    # Run as a script from lineage_chat_bot/rag: the graph index is imported from the project root
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
 import chromadb
 from chromadb.config import Settings
-from openai import OpenAI
 from dotenv import load_dotenv
-from auto_ingestion import auto_ingest
+from auto_ingestion import auto_ingest, collection_version, get_collection
+from embedders import get_embedder
+from retrieval_cache import LRUCache, normalize_query
+from lineage_chat_bot.rag.graph_index import load_graph_index
 
 # Load environment variables
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
 CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "lineage_chunks")
 
-# Initialize Chroma client with persistent storage
-chroma_client = chromadb.PersistentClient(path="./chroma_db")
-collection = chroma_client.get_or_create_collection(CHROMA_COLLECTION)
+# Must be the same embedder the collection was ingested with (RAG_EMBEDDER)
+embedder = get_embedder()
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Repeated questions skip the embedding request, and repeated searches against
+# the same collection version skip Chroma entirely.
+query_embedding_cache = LRUCache()
+retrieval_cache = LRUCache()
+graph_answers = {"count": 0}
+_graph_answers_lock = threading.Lock()
 
 def embed_text(text):
-    response = openai_client.embeddings.create(
-        input=text,
-        model=EMBED_MODEL
-    )
-    return response.data[0].embedding
+    return embedder.embed([text])[0]
+
+def embed_query(query):
+    key = (embedder.model, normalize_query(query))
+    embedding = query_embedding_cache.get(key)
+    if embedding is None:
+        embedding = embed_text(query)
+        query_embedding_cache.put(key, embedding)
+    return embedding
 
 def retrieve(query, k=3):
-    query_embedding = embed_text(query)
+    # Questions naming lineage objects or columns are answered from the graph
+    # index without an embedding request; everything else uses vector search.
+    graph = load_graph_index()
+    if graph is not None:
+        graph_chunks = graph.lookup(query)
+        if graph_chunks:
+            with _graph_answers_lock:
+                graph_answers["count"] += 1
+            return graph_chunks
+
+    # A re-ingestion changes the version, so stale results are never served.
+    # The collection is looked up each time because auto_ingest may recreate it.
+    collection = get_collection()
+    key = (collection_version(collection), embedder.model, normalize_query(query), k)
+    cached = retrieval_cache.get(key)
+    if cached is not None:
+        return [dict(chunk) for chunk in cached]
+
+    query_embedding = embed_query(query)
     results = collection.query(
         query_embeddings=[query_embedding],
         n_results=k
@@ -38,7 +70,25 @@ def retrieve(query, k=3):
         metadatas = results["metadatas"][0]   # First (and only) query result
         for doc, meta in zip(documents, metadatas):
             chunks.append({"document": doc, "metadata": meta})
-    return chunks
+    retrieval_cache.put(key, chunks)
+    return [dict(chunk) for chunk in chunks]
+
+def cache_stats():
+    """Hit-rate metrics of the query embedding and retrieval caches."""
+    return {
+        "query_embeddings": query_embedding_cache.stats(),
+        "retrievals": retrieval_cache.stats(),
+        "graph_answers": graph_answers["count"],
+    }
+
+def format_cache_stats():
+    parts = []
+    stats = cache_stats()
+    for name in ("query_embeddings", "retrievals"):
+        s = stats[name]
+        parts.append(f"{name.replace('_', ' ')}: {s['hits']}/{s['hits'] + s['misses']} hits ({s['hit_rate']:.0%})")
+    parts.append(f"answered from graph index: {stats['graph_answers']}")
+    return "🧠 RAG cache - " + "; ".join(parts)
 
 if __name__ == "__main__":
     # Auto-ingest if needed
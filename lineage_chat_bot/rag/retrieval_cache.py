@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "256"))
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "600"))
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire ttl seconds after being stored.
+
+    Used for query embeddings and retrieval results, which are cheap to keep
+    but cost a network round-trip (or a vector search) to recompute.
+    """
+
+    def __init__(self, max_entries=RAG_CACHE_SIZE, ttl=RAG_CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._clock() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a question, so trivially different repeats share entries."""
+    return " ".join(query.lower().split())
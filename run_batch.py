@@ -0,0 +1,160 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Tool3 uses flat imports and Tool4 imports its modules through the 'src' package,
+# so both tool directories are put on the path and everything runs in this process.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "Tool3"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "Tool4"))
+
+from src.analyze_lineage import analyze_lineage  # noqa: E402
+from src.validation_script import validate  # noqa: E402
+from src.generate_mermaid import generate_lineage_diagram, generate_sharded_diagrams  # noqa: E402
+from src.convert_mmd_to_md import convert_mmd_to_md  # noqa: E402
+from src.schema_registry import format_validation_timings  # noqa: E402
+from src.logging_styles import Colours  # noqa: E402
+
+INPUT_DIR = os.path.join(PROJECT_ROOT, "input")
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, "output")
+
+
+def discover_datasets(input_dir=INPUT_DIR):
+    """
+    Finds every complete input set: input/index/indexN.json with a matching
+    input/ast/astN.json and input/test/testN.sql. Returns them ordered by N.
+    """
+    datasets = []
+    for index_path in glob.glob(os.path.join(input_dir, "index", "index*.json")):
+        match = re.fullmatch(r"index(\d+)\.json", os.path.basename(index_path))
+        if not match:
+            continue
+        n = match.group(1)
+        ast_path = os.path.join(input_dir, "ast", f"ast{n}.json")
+        sql_path = os.path.join(input_dir, "test", f"test{n}.sql")
+        if os.path.exists(ast_path) and os.path.exists(sql_path):
+            datasets.append({"id": n, "index": index_path, "ast": ast_path, "sql": sql_path})
+    return sorted(datasets, key=lambda d: int(d["id"]))
+
+
+def run_tool4(dataset, args):
+    """Validates the inputs, then writes lineageN.json and lineage_diagramN.mmd/.md (plus shards with --shard)."""
+    n = dataset["id"]
+    if not validate(dataset["index"], dataset["ast"], streaming=args.streaming):
+        raise RuntimeError("validation failed")
+    lineage_path = os.path.join(OUTPUT_DIR, f"lineage{n}.json")
+    analyze_lineage(dataset["index"], dataset["ast"], lineage_path,
+                    incremental=args.incremental, streaming=args.streaming, workers=args.workers)
+    diagrams_dir = os.path.join(OUTPUT_DIR, "diagrams")
+    mermaid_path = os.path.join(diagrams_dir, f"lineage_diagram{n}.mmd")
+    generate_lineage_diagram(lineage_path, mermaid_path)
+    convert_mmd_to_md(mermaid_path, os.path.join(diagrams_dir, f"lineage_diagram{n}.md"))
+    if args.shard:
+        generate_sharded_diagrams(lineage_path, os.path.join(diagrams_dir, f"lineage_diagram{n}_shards"), by=args.shard)
+
+
+def run_tool3(dataset, args, cache):
+    """Writes output/documents/proceduresN.md from the index and SQL script."""
+    from doc_generator import generate_docs
+
+    generate_docs(dataset["index"], args.provider, output_dir=os.path.join(OUTPUT_DIR, "documents"),
+                  output_file=f"procedures{dataset['id']}.md", sql_path=dataset["sql"],
+                  use_cache=cache is not None, cache=cache, resume=not args.restart,
+                  sharded=args.sharded_docs)
+
+
+def run_dataset(dataset, args, cache):
+    timing = {"dataset": dataset["id"], "status": "ok"}
+    start = time.perf_counter()
+    try:
+        if not args.skip_lineage:
+            step = time.perf_counter()
+            run_tool4(dataset, args)
+            timing["tool4_s"] = round(time.perf_counter() - step, 3)
+        if not args.skip_docs:
+            step = time.perf_counter()
+            run_tool3(dataset, args, cache)
+            timing["tool3_s"] = round(time.perf_counter() - step, 3)
+    except Exception as e:
+        timing["status"] = f"failed: {e}"
+        print(Colours.RED + f"Dataset {dataset['id']} failed: {e}" + Colours.RESET)
+    timing["total_s"] = round(time.perf_counter() - start, 3)
+    return timing
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run Tool4 (lineage + diagrams) and Tool3 (documentation) over every input set in one process."
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Number of datasets processed concurrently (default: 1).")
+    parser.add_argument("--datasets", nargs="*", help="Only run these dataset numbers, e.g. --datasets 1 3.")
+    parser.add_argument("--provider", choices=["gemini", "azure", "anthropic", "openrouter", "openai"],
+                        help="LLM provider for Tool3. Prompted for interactively if omitted.")
+    parser.add_argument("--skip-docs", action="store_true", help="Skip Tool3 documentation generation.")
+    parser.add_argument("--skip-lineage", action="store_true", help="Skip Tool4 lineage analysis and diagrams.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse cached LLM descriptions.")
+    parser.add_argument("--restart", action="store_true",
+                        help="Regenerate documents from the start instead of resuming interrupted ones.")
+    parser.add_argument("--sharded-docs", action="store_true",
+                        help="Write each dataset's documentation as one file per object plus an index.json manifest.")
+    parser.add_argument("--workers", type=int, default=1, help="Process-pool size for Tool4 lineage analysis.")
+    parser.add_argument("--streaming", action="store_true", help="Stream ast.json files instead of loading them whole.")
+    parser.add_argument("--incremental", action="store_true", help="Only re-analyze changed AST objects.")
+    parser.add_argument("--shard", choices=["component", "schema"],
+                        help="Also write size-capped diagram shards, grouped by connected component or by schema.")
+    parser.add_argument("--summary", default=os.path.join(OUTPUT_DIR, "batch_summary.json"),
+                        help="Where to write the per-dataset timing summary.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Default paths in Tool3 and Tool4 (e.g. input/test/test1.sql, schemas) are relative to the project root
+    os.chdir(PROJECT_ROOT)
+    datasets = discover_datasets()
+    if args.datasets:
+        datasets = [d for d in datasets if d["id"] in set(args.datasets)]
+    if not datasets:
+        print(Colours.RED + "No complete index/ast/sql input sets found." + Colours.RESET)
+        return
+
+    cache = None
+    if not args.skip_docs:
+        from doc_generator import prompt_for_llm_provider
+        from llm_cache import LLMCache, DEFAULT_CACHE_DIR
+
+        args.provider = args.provider or prompt_for_llm_provider()
+        # One cache (and one set of provider limits) shared by every dataset
+        cache = None if args.no_cache else LLMCache(os.path.join(PROJECT_ROOT, DEFAULT_CACHE_DIR))
+
+    print(Colours.YELLOW + f"Running {len(datasets)} dataset(s) with {args.jobs} job(s): "
+          f"{', '.join(d['id'] for d in datasets)}" + Colours.RESET)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            timings = list(executor.map(lambda d: run_dataset(d, args, cache), datasets))
+    finally:
+        if cache is not None:
+            print(cache.report())
+            cache.close()
+    total = round(time.perf_counter() - start, 3)
+
+    summary = {"jobs": args.jobs, "total_s": total, "datasets": timings}
+    os.makedirs(os.path.dirname(os.path.abspath(args.summary)), exist_ok=True)
+    with open(args.summary, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print(Colours.BLUE + "\nDataset  Tool4 (s)  Tool3 (s)  Total (s)  Status" + Colours.RESET)
+    for t in timings:
+        print(f"{t['dataset']:>7}  {t.get('tool4_s', '-'):>9}  {t.get('tool3_s', '-'):>9}  {t['total_s']:>9}  {t['status']}")
+    print(Colours.BLUE + format_validation_timings() + Colours.RESET)
+    print(Colours.GREEN + f"Finished in {total}s. Summary written to {args.summary}" + Colours.RESET)
+
+
+if __name__ == "__main__":
+    main()